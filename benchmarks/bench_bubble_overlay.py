@@ -0,0 +1,32 @@
+# Compares drawing the bubbles every frame with compositing the cached overlay.
+# Run from the repository root:  python benchmarks/bench_bubble_overlay.py
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import gesture_module
+
+FRAMES = 2000
+
+
+def measure(name, step, frame):
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        step(frame)
+    per_frame = (time.perf_counter() - start) / FRAMES * 1000
+    print(f"{name:<32} {per_frame:6.3f} ms/frame")
+
+
+if __name__ == "__main__":
+    frame = np.zeros((500, 775, 3), dtype=np.uint8)
+    height, width, _ = frame.shape
+
+    measure("numbers: draw every frame",
+            gesture_module.number_bubble_layout(width, height).draw, frame)
+    measure("numbers: cached composite", gesture_module.display_number_bubbles, frame)
+    measure("operators: draw every frame",
+            gesture_module.operator_bubble_layout(width, height).draw, frame)
+    measure("operators: cached composite", gesture_module.display_operator_bubbles, frame)
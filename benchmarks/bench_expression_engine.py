@@ -0,0 +1,52 @@
+# Compares eval() with the expression engine on calculator-style expressions.
+# Run from the repository root:  python benchmarks/bench_expression_engine.py
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from expression_engine import IncrementalEvaluator, compile_expression, evaluate
+
+EXPRESSIONS = ["7", "12+3", "12+34*5", "7/8-9", "2 * 3 / 4 - 5 + 6 * 7", "123.5*4-18/3+2"]
+NUMBER = 20000
+
+
+def run_eval():
+    for expression in EXPRESSIONS:
+        eval(expression)
+
+
+def run_engine_cold():
+    compile_expression.cache_clear()
+    for expression in EXPRESSIONS:
+        evaluate(expression)
+
+
+def run_engine_cached():
+    for expression in EXPRESSIONS:
+        evaluate(expression)
+
+
+def run_incremental():  # Running result after every character, as the gesture session does
+    for expression in EXPRESSIONS:
+        evaluator = IncrementalEvaluator()
+        for char in expression:
+            evaluator.push(char)
+
+
+def run_reparse_every_token():  # The alternative: full evaluation of every prefix
+    for expression in EXPRESSIONS:
+        for end in range(1, len(expression) + 1):
+            try:
+                eval(expression[:end])
+            except SyntaxError:
+                pass
+
+
+if __name__ == "__main__":
+    for name, function in [("eval", run_eval), ("engine (cold cache)", run_engine_cold),
+                           ("engine (cached)", run_engine_cached), ("incremental per token", run_incremental),
+                           ("eval per token", run_reparse_every_token)]:
+        seconds = timeit.timeit(function, number=NUMBER)
+        print(f"{name:<24} {seconds / NUMBER / len(EXPRESSIONS) * 1e6:8.2f} us/expression")
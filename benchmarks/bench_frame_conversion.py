@@ -0,0 +1,57 @@
+# Measures GUI-thread CPU per frame for the old and new webcam display paths.
+# Run from the repository root:  python benchmarks/bench_frame_conversion.py
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+import numpy as np
+from PySide6.QtWidgets import QApplication, QLabel
+from PySide6.QtGui import QImage, QPixmap
+from gui import WebcamView
+
+FRAMES = 500
+
+
+def make_frames(count):
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 256, (500, 775, 3), dtype=np.uint8) for _ in range(count)]
+
+
+def old_path(label, frame): # process_queue before push delivery: resize, BGR->RGB, QImage, QPixmap copy
+    frame_resized = cv2.resize(frame, (800, 500))
+    frame_rgb = cv2.cvtColor(frame_resized, cv2.COLOR_BGR2RGB)
+    height, width, channel = frame_rgb.shape
+    q_image = QImage(frame_rgb.data, width, height, 3 * width, QImage.Format_RGB888)
+    label.setPixmap(QPixmap.fromImage(q_image))
+
+
+def new_path(view, frame): # update_webcam_feed: wrap the BGR buffer, paint it directly
+    view.set_frame(frame)
+
+
+def measure(name, widget, step, frames):
+    target = QImage(widget.size(), QImage.Format_RGB32)
+    start_cpu, start_wall = time.process_time(), time.perf_counter()
+    for frame in frames:
+        step(widget, frame)
+        widget.render(target)  # Include the paint cost the GUI thread pays for each frame
+    cpu = (time.process_time() - start_cpu) / len(frames) * 1000
+    wall = (time.perf_counter() - start_wall) / len(frames) * 1000
+    print(f"{name:<28} cpu {cpu:6.3f} ms/frame   wall {wall:6.3f} ms/frame")
+
+
+if __name__ == "__main__":
+    app = QApplication([])
+    frames = make_frames(16) * (FRAMES // 16)
+
+    label = QLabel()
+    label.setFixedSize(775, 500)
+    view = WebcamView()
+    view.setFixedSize(775, 500)
+
+    measure("resize + RGB + QPixmap", label, old_path, frames)
+    measure("BGR888 zero-copy paint", view, new_path, frames)
@@ -0,0 +1,87 @@
+# Gesture pipeline benchmark suite for CPU-only machines, built on the headless harness.
+# Run from the repository root and keep the JSON output to compare across commits:
+#   python benchmarks/bench_gesture_pipeline.py --output bench_gesture.json
+#   python benchmarks/bench_gesture_pipeline.py --compare bench_gesture.json
+#   python benchmarks/bench_gesture_pipeline.py --video session.mp4   # Also full frame vs ROI tracking on a recording
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gesture_module import DISPLAY_RESOLUTION, create_hand_detector
+from headless import run_pipeline, scripted_source, synthetic_frames, video_source, format_report
+
+SCRIPT = "12+34*5=7/8-9="
+EXPECTED_RESULTS = ["12+34*5 = 182", "7/8-9 = -8.125"]
+
+
+def selection_scenario(jitter=0.0, hover=0.65):  # Selection and rendering only, landmarks are scripted
+    return run_pipeline(scripted_source(SCRIPT, jitter=jitter, hover=hover), detector=None, expected=SCRIPT)
+
+
+def detection_scenario(frames, video=None, **detector_options):  # MediaPipe on synthetic frames or a recording
+    detector = create_hand_detector(DISPLAY_RESOLUTION, **detector_options)
+    detector.warm_up((DISPLAY_RESOLUTION[1], DISPLAY_RESOLUTION[0], 3))
+    try:
+        return run_pipeline(video_source(video) if video else synthetic_frames(frames), detector)
+    finally:
+        detector.close()
+
+
+def run_suite(frames, video=None):
+    reports = {
+        "selection_scripted": selection_scenario(),
+        "selection_jitter": selection_scenario(jitter=5.0),
+        # Rests past dwell_time after every selection, so a bubble of the next phase under the finger would fire
+        "selection_long_hover": selection_scenario(jitter=5.0, hover=1.5),
+    }
+    for name in ("selection_scripted", "selection_jitter", "selection_long_hover"):
+        results = [text for text in reports[name]["expressions"] if " = " in text]
+        if results != EXPECTED_RESULTS or reports[name]["error_rate"]:
+            raise AssertionError(f"{name} produced {results} with {reports[name]['error_rate']:.1%} selection "
+                                 f"errors, expected {EXPECTED_RESULTS}")
+    reports["detection_every_frame"] = detection_scenario(frames, motion_gated=False)
+    reports["detection_motion_gated"] = detection_scenario(frames, motion_gated=True)
+    reports["detection_half_resolution"] = detection_scenario(
+        frames, inference_resolution=(DISPLAY_RESOLUTION[0] // 2, DISPLAY_RESOLUTION[1] // 2))
+    # ROI tracking runs MediaPipe in static image mode, i.e. palm detection on every frame; with no hand in
+    # the synthetic frames this is its full-frame cost, a recording with a hand also exercises the crops
+    reports["detection_roi_tracking"] = detection_scenario(frames, roi_tracking=True, motion_gated=False)
+    if video:
+        reports["video_every_frame"] = detection_scenario(frames, video, motion_gated=False)
+        reports["video_roi_tracking"] = detection_scenario(frames, video, roi_tracking=True, motion_gated=False)
+    return reports
+
+
+def compare(reports, baseline):
+    for name, report in reports.items():
+        if name not in baseline:
+            continue
+        old = baseline[name]
+        fps_change = (report["fps"] / old["fps"] - 1) * 100 if old["fps"] else 0.0
+        print(f"{name:<28} fps {old['fps']:8.1f} -> {report['fps']:8.1f} ({fps_change:+.1f}%)   "
+              f"p95 {old['latency_ms']['p95']:7.2f} -> {report['latency_ms']['p95']:7.2f} ms")
+        if "error_rate" in report and "error_rate" in old:
+            print(f"{'':<28} selections/min {old['selections_per_minute']:6.1f} -> "
+                  f"{report['selections_per_minute']:6.1f}   errors {old['error_rate']:.1%} -> {report['error_rate']:.1%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=300, help="Synthetic frames per detection scenario")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON file from an earlier run")
+    parser.add_argument("--video", help="Recording with a hand, to compare full-frame and ROI inference on it")
+    args = parser.parse_args()
+
+    reports = run_suite(args.frames, args.video)
+    for name, report in reports.items():
+        print(format_report(name, report))
+    if args.compare:
+        with open(args.compare) as f:
+            compare(reports, json.load(f))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(reports, f, indent=2)
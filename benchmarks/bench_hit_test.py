@@ -0,0 +1,62 @@
+# Compares the per-bubble hit-test loop with label map lookups, for the number layout and a
+# larger scientific layout with custom-shaped bubbles.
+# Run from the repository root:  python benchmarks/bench_hit_test.py
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import gesture_module
+from bubble_layout import Bubble, BubbleLayout
+
+WIDTH, HEIGHT = gesture_module.DISPLAY_RESOLUTION
+POINTS = 20000
+SCIENTIFIC = ["sin", "cos", "tan", "log", "ln", "sqrt", "^", "(", ")", ".", "pi", "e", "%", "!", "1/x", "+/-",
+              "1", "2", "3", "4", "5", "6", "7", "8", "9", "0", "+", "-", "*", "/", "=", "->",
+              "M+", "M-", "MR", "MC", "x2", "x3", "abs", "mod"]
+
+
+def scientific_layout(radius=28):
+    # 8 x 5 grid; wide "pill" polygons for the function keys, circles for the rest
+    bubbles = []
+    for i, label in enumerate(SCIENTIFIC):
+        center = (int(WIDTH * (i % 8 + 1) / 9), int(HEIGHT * (i // 8 + 1) / 6))
+        polygon = None
+        if len(label) > 1:
+            cx, cy = center
+            polygon = [(cx - radius * 1.3, cy - radius * 0.7), (cx + radius * 1.3, cy - radius * 0.7),
+                       (cx + radius * 1.3, cy + radius * 0.7), (cx - radius * 1.3, cy + radius * 0.7)]
+        bubbles.append(Bubble(label, center, radius, (46, 204, 113), font_scale=0.6, polygon=polygon))
+    return BubbleLayout(bubbles, WIDTH, HEIGHT)
+
+
+def loop_hit_test(layout, point, radius):  # Previous approach: square check against every center
+    x, y = point
+    for label, (bx, by) in layout.centers.items():
+        if abs(bx - x) < radius and abs(by - y) < radius:
+            return label
+    return None
+
+
+def measure(name, hit_test, points):
+    start = time.perf_counter()
+    for point in points:
+        hit_test(point)
+    per_lookup = (time.perf_counter() - start) / len(points) * 1e6
+    print(f"{name:<40} {per_lookup:6.2f} us/lookup")
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    points = [(int(x), int(y)) for x, y in zip(rng.integers(0, WIDTH, POINTS), rng.integers(0, HEIGHT, POINTS))]
+    for name, layout, radius in [("numbers (11 bubbles)", gesture_module.number_bubble_layout(WIDTH, HEIGHT),
+                                  gesture_module.bubble_radius),
+                                 ("scientific (40 bubbles)", scientific_layout(), 28)]:
+        start = time.perf_counter()
+        layout.label_map()
+        build_ms = (time.perf_counter() - start) * 1000
+        print(f"{name}: label map built once in {build_ms:.1f} ms, {layout.label_map().nbytes // 1024} KiB")
+        measure("  loop over bubbles", lambda point: loop_hit_test(layout, point, radius), points)
+        measure("  label map", layout.label_at, points)
@@ -0,0 +1,65 @@
+# Records a long scripted session as a landmark trace, then replays it through the selection logic:
+# frame by frame as the pipeline does (process_frame) and through the trace replay fast path.
+# Run from the repository root:  python benchmarks/bench_trace_replay.py [--repeats 200]
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from gesture_module import DISPLAY_RESOLUTION, GestureSession
+from headless import scripted_source
+from landmark_trace import LandmarkTraceWriter, read_trace, replay_trace
+
+SCRIPT = "12+34*5=7/8-9="
+
+
+def record(path, repeats):
+    with LandmarkTraceWriter(path, DISPLAY_RESOLUTION) as trace:
+        offset = 0.0
+        for repeat in range(repeats):
+            timestamp = offset
+            for timestamp, _, landmarks in scripted_source(SCRIPT, jitter=5.0, seed=repeat):
+                trace.write(offset + timestamp, landmarks)
+            offset += timestamp + 1.0
+    return trace.frames
+
+
+def replay_per_frame(records, display_resolution):  # What replaying through the pipeline entry point costs
+    width, height = display_resolution
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+    events = []
+    session = GestureSession(on_event=events.append)
+    start = time.perf_counter()
+    for record in records:
+        session.process_frame(frame, record["landmarks"] if record["has_hand"] else None, float(record["timestamp"]))
+    return events, len(records) / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeats", type=int, default=200, help="Scripted sessions in the trace")
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "bench.trace")
+    start = time.perf_counter()
+    frames = record(path, args.repeats)
+    record_seconds = time.perf_counter() - start
+    display_resolution, records = read_trace(path)
+    duration = records["timestamp"][-1] - records["timestamp"][0]
+    print(f"{frames} frames ({duration / 60:.1f} min of use), {os.path.getsize(path) / 2**20:.1f} MiB, "
+          f"recorded at {frames / record_seconds:.0f} frames/s")
+
+    events = []
+    fps = replay_trace(records, GestureSession(on_event=events.append), display_resolution)
+    print(f"trace replay              {fps:10.0f} frames/s  ({duration / (frames / fps):.0f}x real time)")
+    per_frame_events, per_frame_fps = replay_per_frame(records, display_resolution)
+    print(f"process_frame per record  {per_frame_fps:10.0f} frames/s")
+    if events != per_frame_events:
+        raise AssertionError("Trace replay and process_frame produced different events")
+    results = sum(" = " in text for text, _ in events)
+    print(f"{results} results, identical events on both paths")
+    os.remove(path)
@@ -0,0 +1,78 @@
+# Recognition latency and accuracy of a speech backend over a recorded WAV corpus, no microphone needed.
+# The corpus directory holds mono 16-bit WAV files and a transcripts.tsv with "file<TAB>reference words":
+#   python benchmarks/bench_voice_corpus.py corpus/ --backend vosk --model models/vosk-model-small-en-us-0.15
+import argparse
+import os
+import sys
+import time
+import wave
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from speech_backends import create_speech_backend, wav_chunks
+from voice_grammar import parse_voice_command
+
+
+def read_corpus(directory):
+    with open(os.path.join(directory, "transcripts.tsv")) as f:
+        for line in f:
+            if line.strip() and not line.startswith("#"):
+                name, reference = line.rstrip("\n").split("\t", 1)
+                yield os.path.join(directory, name), reference
+
+
+def word_errors(reference, hypothesis):  # Levenshtein distance over words
+    ref, hyp = reference.lower().split(), hypothesis.lower().split()
+    row = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        previous, row[0] = row[0], i
+        for j, hyp_word in enumerate(hyp, 1):
+            previous, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, previous + (ref_word != hyp_word))
+    return row[-1], len(ref)
+
+
+def run_file(backend, path):
+    with wave.open(path, "rb") as wav:
+        audio_seconds = wav.getnframes() / wav.getframerate()
+    sample_rate, chunks = wav_chunks(path)
+    start = time.perf_counter()
+    first_partial = None
+    hypothesis = ""
+    for kind, text in backend.stream(chunks, sample_rate):
+        if kind == "partial" and first_partial is None:
+            first_partial = time.perf_counter() - start
+        elif kind == "final":
+            hypothesis = text
+    return hypothesis, time.perf_counter() - start, first_partial, audio_seconds
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("corpus", help="Directory with WAV files and transcripts.tsv")
+    parser.add_argument("--backend", default="vosk", choices=["vosk", "google"])
+    parser.add_argument("--model", help="Vosk model directory")
+    args = parser.parse_args()
+
+    backend = create_speech_backend(args.backend, args.model)
+    errors = words = correct = files = 0
+    latencies, partial_latencies, audio_total = [], [], 0.0
+    for path, reference in read_corpus(args.corpus):
+        hypothesis, latency, first_partial, audio_seconds = run_file(backend, path)
+        file_errors, file_words = word_errors(reference, hypothesis)
+        errors, words, files = errors + file_errors, words + file_words, files + 1
+        correct += parse_voice_command(hypothesis) == parse_voice_command(reference)
+        latencies.append(latency)
+        audio_total += audio_seconds
+        if first_partial is not None:
+            partial_latencies.append(first_partial)
+        print(f"{os.path.basename(path):<28} {latency * 1000:8.1f} ms  '{hypothesis}'")
+
+    if not files:
+        sys.exit("Empty corpus")
+    latencies.sort()
+    print(f"\n{args.backend}: {files} files, word error rate {errors / max(words, 1):.1%}, "
+          f"expression accuracy {correct / files:.1%}")
+    print(f"latency p50 {latencies[len(latencies) // 2] * 1000:.1f} ms, "
+          f"real-time factor {sum(latencies) / audio_total:.3f}")
+    if partial_latencies:
+        print(f"first partial after {sum(partial_latencies) / len(partial_latencies) * 1000:.1f} ms on average")
@@ -0,0 +1,89 @@
+# Throughput and coverage of the voice grammar against the original parser over a transcript corpus.
+# Each corpus line is one utterance; n-best alternatives are separated by " | ", most likely first.
+# Run from the repository root:  python benchmarks/bench_voice_grammar.py [transcripts.txt]
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from voice_grammar import parse_voice_alternatives, parse_voice_command
+
+CORPUS = [
+    "add two and three",
+    "subtract three from nine",
+    "multiply four by six",
+    "divide eight by two",
+    "add 2 and 3 and 4",
+    "twenty three plus four times two",
+    "one hundred and five minus seven",
+    "what is twelve times twelve",
+    "three point one four times two",
+    "negative five plus eleven",
+    "ten divided by four",
+    "two thousand three hundred over ten",
+    "45 + 17",
+    "1,000 plus 5",
+    "ad to and three | add two and three",
+    "to times for | two times four",
+    "sixty minus fourteen",
+    "seven multiplied by eight",
+    "nine over three plus one",
+]
+NUMBER = 2000
+
+
+def legacy_parse(command):  # parse_voice_command as it was in main.py
+    number_words = {
+        "zero": 0, "one": 1, "two": 2, "three": 3, "four": 4,
+        "five": 5, "six": 6, "seven": 7, "eight": 8, "nine": 9,
+    }
+
+    words = command.lower().split()
+    for i, word in enumerate(words):
+        if word in number_words:
+            words[i] = str(number_words[word])
+    command = " ".join(words)
+
+    try:
+        numbers = [int(s) for s in command.split() if s.isdigit()]
+        if "add" in command:
+            return f"{' + '.join(map(str, numbers))}"
+        elif "subtract" in command:
+            return f"{' - '.join(map(str, numbers))}"
+        elif "multiply" in command:
+            return f"{' * '.join(map(str, numbers))}"
+        elif "divide" in command:
+            return f"{' / '.join(map(str, numbers))}"
+        else:
+            return f"Error: Unrecognized operation in command: '{command}'"
+    except Exception as e:
+        print(f"Error parsing voice command: {e}")
+    return "Error: Command not recognized"
+
+
+def read_corpus(path):
+    with open(path) as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+
+def parsed(expression):  # A parse the calculator can evaluate
+    return bool(expression) and not expression.startswith("Error")
+
+
+if __name__ == "__main__":
+    corpus = read_corpus(sys.argv[1]) if len(sys.argv) > 1 else CORPUS
+    utterances = [[alternative.strip() for alternative in line.split(" | ")] for line in corpus]
+    best = [alternatives[0] for alternatives in utterances]
+
+    runs = [
+        ("legacy, best transcript", lambda: [legacy_parse(text) for text in best]),
+        ("grammar, best transcript", lambda: [parse_voice_command(text) for text in best]),
+        ("grammar, n-best", lambda: [parse_voice_alternatives(alternatives) for alternatives in utterances]),
+    ]
+    print(f"{len(utterances)} utterances")
+    for name, run in runs:
+        seconds = timeit.timeit(run, number=NUMBER)
+        valid = sum(parsed(expression) for expression in run())
+        print(f"{name:<26} {seconds / NUMBER / len(utterances) * 1e6:8.2f} us/utterance"
+              f"  {NUMBER * len(utterances) / seconds:10.0f} utterances/s  parsed {valid}/{len(utterances)}")
@@ -0,0 +1,94 @@
+# Equivalence check for the expression engine on random calculator expressions:
+#   - IncrementalEvaluator, fed one character at a time, agrees with evaluate() in every mode, on the
+#     finished expression and on every prefix that is itself a complete expression
+#   - in float mode, evaluate() agrees with eval() in value, number type and division by zero
+# Run from the repository root; exits with status 1 on the first mismatches:
+#   python benchmarks/check_expression_engine.py --count 20000 --seed 1
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from expression_engine import MODES, ExpressionError, IncrementalEvaluator, evaluate
+
+
+def random_number(rng):
+    # No leading zeros: eval() rejects "07", which the engine (and gesture input) accepts
+    integer = str(rng.randint(0, 9)) if rng.random() < 0.4 else str(rng.randint(1, 999))
+    if rng.random() < 0.25:
+        return f"{integer}.{rng.randint(0, 99)}"
+    return integer
+
+
+def random_expression(rng, depth=0):
+    # Calculator grammar with unary signs and parentheses; zeros are common enough to divide by
+    parts = []
+    for index in range(rng.randint(1, 5)):
+        if index:
+            parts.append(rng.choice("+-*/"))
+        operand = random_number(rng)
+        if depth < 2 and rng.random() < 0.15:
+            operand = f"({random_expression(rng, depth + 1)})"
+        if rng.random() < 0.1:
+            operand = rng.choice("+-") + operand
+        parts.append(operand)
+    return "".join(parts)
+
+
+def outcome(function, *args):  # Value, or the kind of error the calculator would report
+    try:
+        return function(*args)
+    except ZeroDivisionError:
+        return ZeroDivisionError
+    except (ExpressionError, ArithmeticError, SyntaxError):
+        return ExpressionError
+
+
+def same(left, right):
+    return left is right or (type(left) is type(right) and left == right)
+
+
+def incremental_outcomes(expression, mode):
+    # Running value after every character, next to evaluate() for the prefixes that are complete
+    evaluator = IncrementalEvaluator(mode)
+    for end, char in enumerate(expression, 1):
+        value = evaluator.push(char)
+        prefix = expression[:end]
+        expected = outcome(evaluate, prefix, mode)
+        if expected is ExpressionError:
+            continue  # Incomplete prefix, e.g. "12+": the running value is the result so far
+        yield prefix, value, None if expected is ZeroDivisionError else expected
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=20000, help="Random expressions to check")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    mismatches = []
+    checked = 0
+    for _ in range(args.count):
+        expression = random_expression(rng)
+        expected = outcome(eval, expression)
+        if not same(outcome(evaluate, expression), expected):
+            mismatches.append(f"eval vs evaluate: {expression!r} -> {expected!r}, "
+                              f"{outcome(evaluate, expression)!r}")
+        for mode in MODES:
+            for prefix, value, expected in incremental_outcomes(expression, mode):
+                checked += 1
+                if not same(value, expected):
+                    mismatches.append(f"{mode}: incremental {prefix!r} -> {value!r}, evaluate {expected!r}")
+
+    print(f"{args.count} expressions, {checked} complete prefixes across {len(MODES)} modes, "
+          f"{len(mismatches)} mismatches")
+    for mismatch in mismatches[:20]:
+        print(f"  {mismatch}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+# Load test for the calculator service: stand-in kiosks stream scripted JPEG frames over HTTP and
+# check the results, while throughput, request latency and the wait for an inference worker are measured.
+# The frames show the fingertip as a white dot, which only the stand-in detector finds, so the numbers
+# are the service's overhead around inference, not MediaPipe capacity (time.sleep releases the GIL).
+# Without --url the service runs in this process with the stand-in detector (no MediaPipe needed):
+#   python benchmarks/load_generator.py --clients 4 --workers 2 --inference-ms 8
+#   python benchmarks/load_generator.py --clients 4 --fps 30        # Kiosk frame rate instead of flat out
+#   python benchmarks/load_generator.py --url http://127.0.0.1:8765  # calculator_service.py --stand-in-detector 8
+import argparse
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+from urllib.parse import urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+from bench_gesture_pipeline import EXPECTED_RESULTS, SCRIPT
+from gesture_module import DISPLAY_RESOLUTION
+from headless import percentile, scripted_source
+from hand_worker import INDEX_FINGER_TIP
+
+
+def kiosk_frames(seed, jitter=4.0):
+    # (timestamp, JPEG) pairs of a webcam seeing the scripted fingertip as a bright dot. Frames are
+    # mirrored, because the service flips them like the webcam feed.
+    width, height = DISPLAY_RESOLUTION
+    frames = []
+    for timestamp, frame, landmarks in scripted_source(SCRIPT, jitter=jitter, seed=seed):
+        if landmarks is not None:
+            x = int(landmarks[INDEX_FINGER_TIP, 0] * width)
+            y = int(landmarks[INDEX_FINGER_TIP, 1] * height)
+            cv2.circle(frame, (width - 1 - x, y), 6, (255, 255, 255), -1)
+        frames.append((timestamp, cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 80])[1].tobytes()))
+    return frames
+
+
+class Kiosk(threading.Thread):
+    def __init__(self, address, frames, fps):
+        super().__init__(daemon=True)
+        self.address = address
+        self.frames = frames
+        self.fps = fps  # 0 sends the next frame as soon as the last response arrives
+        self.latencies = []
+        self.results = []
+        self.error = None
+
+    def request(self, connection, method, path, body=b"", headers=None):
+        connection.request(method, path, body, headers or {})
+        response = connection.getresponse()
+        payload = json.loads(response.read())
+        if response.status >= 300:
+            raise RuntimeError(f"{method} {path}: {response.status} {payload}")
+        return payload
+
+    def run(self):
+        connection = http.client.HTTPConnection(*self.address)
+        try:
+            session = self.request(connection, "POST", "/sessions", b"{}")["session"]
+            start = time.perf_counter()
+            for index, (timestamp, jpeg) in enumerate(self.frames):
+                if self.fps:
+                    delay = start + index / self.fps - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                sent = time.perf_counter()
+                reply = self.request(connection, "POST", f"/sessions/{session}/frames", jpeg,
+                                     {"Content-Type": "image/jpeg", "X-Timestamp": f"{timestamp:.6f}"})
+                self.latencies.append((time.perf_counter() - sent) * 1000)
+                self.results.extend(text for text in reply["events"] if " = " in text)
+            self.request(connection, "DELETE", f"/sessions/{session}")
+        except Exception as e:
+            self.error = e
+        finally:
+            connection.close()
+
+
+def start_local_service(workers, inference_ms):
+    from calculator_service import CalculatorService, InferencePool, StandInHandDetector, create_server
+    pool = InferencePool(lambda: StandInHandDetector(inference_ms), workers)
+    server = create_server(CalculatorService(pool), port=0)  # Any free port
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def stop():
+        server.shutdown()
+        server.server_close()
+        pool.close()
+
+    return server.server_address[:2], stop
+
+
+def fetch_stats(address):
+    connection = http.client.HTTPConnection(*address)
+    try:
+        connection.request("GET", "/stats")
+        return json.loads(connection.getresponse().read())
+    finally:
+        connection.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=4, help="Concurrent stand-in kiosks")
+    parser.add_argument("--fps", type=float, default=0, help="Frames per second per kiosk, 0 for as fast as possible")
+    parser.add_argument("--url", help="Running service to test instead of an in-process one")
+    parser.add_argument("--workers", type=int, default=2, help="Inference workers of the in-process service")
+    parser.add_argument("--inference-ms", type=float, default=8.0, help="Stand-in inference time per frame")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    args = parser.parse_args()
+
+    stop = None
+    if args.url:
+        url = urlparse(args.url)
+        address = (url.hostname, url.port or 80)
+    else:
+        address, stop = start_local_service(args.workers, args.inference_ms)
+
+    print(f"Encoding frames for {args.clients} kiosks...")
+    kiosks = [Kiosk(address, kiosk_frames(seed), args.fps) for seed in range(args.clients)]
+    start = time.perf_counter()
+    for kiosk in kiosks:
+        kiosk.start()
+    for kiosk in kiosks:
+        kiosk.join()
+    elapsed = time.perf_counter() - start
+    stats = fetch_stats(address)
+    if stop is not None:
+        stop()
+
+    for index, kiosk in enumerate(kiosks):
+        if kiosk.error is not None:
+            sys.exit(f"Kiosk {index} failed: {kiosk.error}")
+    latencies = sorted(latency for kiosk in kiosks for latency in kiosk.latencies)
+    correct = sum(kiosk.results == EXPECTED_RESULTS for kiosk in kiosks)
+    report = {
+        "clients": args.clients,
+        "frames": len(latencies),
+        "seconds": elapsed,
+        "frames_per_second": len(latencies) / elapsed,
+        "per_kiosk_fps": len(latencies) / elapsed / args.clients,
+        "latency_ms": {f"p{int(q * 100)}": percentile(latencies, q) for q in (0.5, 0.95, 0.99)},
+        "inference_queue_wait_ms": stats["metrics"]["stages"]["inference_queue_wait"]["p50_ms"],
+        "kiosks_correct": correct,
+    }
+    latency = report["latency_ms"]
+    print(f"{args.clients} kiosks: {report['frames']} frames in {elapsed:.1f} s, "
+          f"{report['frames_per_second']:.1f} frames/s ({report['per_kiosk_fps']:.1f} per kiosk)")
+    print(f"request latency p50 {latency['p50']:.1f} / p95 {latency['p95']:.1f} / p99 {latency['p99']:.1f} ms, "
+          f"inference queue wait p50 {report['inference_queue_wait_ms']:.1f} ms")
+    print(f"{correct} of {args.clients} kiosks produced {EXPECTED_RESULTS}")
+    if args.url and correct == 0:
+        print("The kiosk frames have no real hand: start the service with --stand-in-detector MS to check results")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if correct != args.clients:
+        sys.exit(1)
@@ -0,0 +1,102 @@
+import cv2
+import numpy as np
+
+# Bubble layouts: what each phase draws and where the fingertip selects.
+# A layout is built once per frame size and rasterizes its bubbles into uint8 label maps
+# (0 = no bubble, i = i-th bubble), so a hit test is one array lookup however many bubbles
+# there are and whatever their shape. Where scaled regions overlap, a pixel belongs to the
+# bubble with the nearest center.
+
+MAX_BUBBLES = 255  # Ids must fit the uint8 label map
+
+
+class Bubble:
+    # One selectable region: a circle of `radius` around `center`, or a custom polygon
+    def __init__(self, label, center, radius, color, text=None, font_scale=1.4, polygon=None):
+        self.label = label  # Token appended to the expression (or "->", "=" for the phase controls)
+        self.center = center
+        self.radius = radius
+        self.color = color
+        self.text = label if text is None else text  # Text drawn on the bubble
+        self.font_scale = font_scale
+        self.polygon = polygon  # Points in frame pixels, used instead of the circle when set
+
+    def outline(self, scale=1.0):  # Polygon points grown or shrunk around the center
+        center = np.array(self.center, dtype=np.float32)
+        return np.round((np.asarray(self.polygon, dtype=np.float32) - center) * scale + center).astype(np.int32)
+
+    def bounds(self, scale=1.0):  # (x0, y0, x1, y1) of the scaled region
+        if self.polygon is None:
+            radius = max(int(round(self.radius * scale)), 1)
+            x, y = self.center
+            return x - radius, y - radius, x + radius + 1, y + radius + 1
+        points = self.outline(scale)
+        return (int(points[:, 0].min()), int(points[:, 1].min()),
+                int(points[:, 0].max()) + 1, int(points[:, 1].max()) + 1)
+
+    def fill(self, canvas, value, scale=1.0, origin=(0, 0)):
+        # Fills the scaled region; origin is the frame position of the canvas' top-left pixel
+        if self.polygon is None:
+            center = (self.center[0] - origin[0], self.center[1] - origin[1])
+            cv2.circle(canvas, center, max(int(round(self.radius * scale)), 1), value, -1)
+        else:
+            cv2.fillPoly(canvas, [self.outline(scale) - np.array(origin, dtype=np.int32)], value)
+
+    def draw(self, canvas):
+        self.fill(canvas, self.color)
+        text_size = cv2.getTextSize(self.text, cv2.FONT_HERSHEY_DUPLEX, self.font_scale, 3)[0]
+        text_x = self.center[0] - text_size[0] // 2
+        text_y = self.center[1] + text_size[1] // 2
+        cv2.putText(canvas, self.text, (text_x, text_y),
+                    cv2.FONT_HERSHEY_DUPLEX, self.font_scale, (255, 255, 255), 3)
+
+
+class BubbleLayout:
+    # The bubbles of one phase at one frame size
+    def __init__(self, bubbles, width, height):
+        if len(bubbles) > MAX_BUBBLES:
+            raise ValueError(f"A layout holds at most {MAX_BUBBLES} bubbles, got {len(bubbles)}")
+        self.bubbles = tuple(bubbles)
+        self.width = width
+        self.height = height
+        self.labels = tuple(bubble.label for bubble in self.bubbles)
+        self.centers = {bubble.label: bubble.center for bubble in self.bubbles}
+        self._label_maps = {}  # Region scale -> label map
+
+    def draw(self, canvas):
+        for bubble in self.bubbles:
+            bubble.draw(canvas)
+
+    def label_at(self, point, scale=1.0):
+        # Label of the bubble under the point, or None; `scale` grows or shrinks every region
+        x, y = int(point[0]), int(point[1])
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return None
+        index = self.label_map(scale)[y, x]
+        return self.labels[index - 1] if index else None
+
+    def label_map(self, scale=1.0):
+        label_map = self._label_maps.get(scale)
+        if label_map is None:
+            label_map = self._label_maps[scale] = self._build_label_map(scale)
+        return label_map
+
+    def _build_label_map(self, scale):
+        label_map = np.zeros((self.height, self.width), dtype=np.uint8)
+        nearest = np.full((self.height, self.width), np.inf, dtype=np.float32)  # Squared distance to the owner
+        for index, bubble in enumerate(self.bubbles, 1):
+            x0, y0, x1, y1 = bubble.bounds(scale)
+            x0, y0, x1, y1 = max(x0, 0), max(y0, 0), min(x1, self.width), min(y1, self.height)
+            if x1 <= x0 or y1 <= y0:
+                continue  # Entirely outside the frame
+            region = np.zeros((y1 - y0, x1 - x0), dtype=np.uint8)  # Rasterized around the bubble only
+            bubble.fill(region, 1, scale, origin=(x0, y0))
+            rows, cols = np.nonzero(region)
+            rows += y0
+            cols += x0
+            distance = (cols - bubble.center[0]) ** 2 + (rows - bubble.center[1]) ** 2
+            closer = distance < nearest[rows, cols]
+            rows, cols = rows[closer], cols[closer]
+            label_map[rows, cols] = index
+            nearest[rows, cols] = distance[closer]
+        return label_map
@@ -0,0 +1,53 @@
+import cv2
+import numpy as np
+
+
+class BubbleOverlay:
+    # Pre-rendered BGR layer plus a uint8 mask, cropped to the area that was drawn on
+    def __init__(self, layer, mask, box):
+        self.layer = layer
+        self.mask = mask
+        self.box = box  # (y0, y1, x0, x1) of the drawn area inside the frame
+
+    def apply(self, frame):  # One masked copy instead of per-bubble drawing calls
+        y0, y1, x0, x1 = self.box
+        if y1 > y0:
+            # cv2.copyTo writes into the frame view in place; np.copyto(where=...) is several times slower
+            cv2.copyTo(self.layer, self.mask, frame[y0:y1, x0:x1])
+
+
+class OverlayCache:
+    # Overlays keyed by frame size, phase and layout parameters; rebuilt only when the key changes
+    def __init__(self):
+        self._overlays = {}
+
+    def get(self, key, frame_shape, render):
+        overlay = self._overlays.get(key)
+        if overlay is None:
+            overlay = self._overlays[key] = self._build(frame_shape, render)
+        return overlay
+
+    def invalidate(self):  # Call after changing the layout (e.g. bubble radius or positions)
+        self._overlays.clear()
+
+    def __len__(self):
+        return len(self._overlays)
+
+    @staticmethod
+    def _build(frame_shape, render):
+        # Rendering on a black and a white canvas: pixels that match in both were drawn on
+        height, width = frame_shape[:2]
+        dark = np.zeros((height, width, 3), dtype=np.uint8)
+        light = np.full((height, width, 3), 255, dtype=np.uint8)
+        render(dark)
+        render(light)
+        drawn = np.all(dark == light, axis=2)
+
+        rows, cols = np.nonzero(drawn)
+        if rows.size == 0:
+            return BubbleOverlay(dark[:0, :0], drawn[:0, :0].astype(np.uint8), (0, 0, 0, 0))
+        y0, y1 = int(rows.min()), int(rows.max()) + 1
+        x0, x1 = int(cols.min()), int(cols.max()) + 1
+        layer = np.ascontiguousarray(dark[y0:y1, x0:x1])
+        mask = drawn[y0:y1, x0:x1].astype(np.uint8)
+        return BubbleOverlay(layer, mask, (y0, y1, x0, x1))
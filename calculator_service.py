@@ -0,0 +1,381 @@
+import argparse
+import io
+import itertools
+import json
+import math
+import queue
+import threading
+import time
+import wave
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import cv2
+import numpy as np
+from expression_engine import evaluate_expression
+from gesture_module import DISPLAY_RESOLUTION, GestureSession, create_hand_detector, prepare_frame
+from hand_worker import LANDMARK_COUNT
+from stage_metrics import metrics
+from voice_grammar import parse_voice_alternatives
+
+# Local calculator service: several kiosk front-ends on one host share the gesture and voice
+# pipeline over HTTP, each with its own session instead of the globals of the Qt application.
+#   POST   /sessions                 JSON options (dwell_time, rearm_time, smoothing) -> {"session": id}
+#   POST   /sessions/<id>/frames     JPEG webcam frame, optional X-Timestamp header (seconds)
+#                                    -> landmarks, fingertip, phase, expression and new events
+#   POST   /sessions/<id>/audio      mono 16-bit WAV utterance -> transcripts, expression, result
+#   POST   /sessions/<id>/reset      clears the session's expression
+#   DELETE /sessions/<id>
+#   GET    /stats                    stage metrics, sessions and inference pool
+#   python calculator_service.py --port 8765 --workers 2
+
+# Inference Pool
+class _PoolSession:
+    def __init__(self):
+        self.detector = None  # Created by the first worker that runs a frame of the session
+        self.busy = False  # A worker is running the detector
+        self.released = False  # Closed while busy: the worker closes the detector when it is done
+
+
+class InferencePool:
+    # Worker threads running hand inference for every session from one shared queue, so an idle worker
+    # always takes the next frame. MediaPipe tracks the hand between the frames of one stream, so each
+    # session keeps its own detector (one MediaPipe graph, i.e. memory grows with open sessions, not
+    # with workers) and frames are detected one at a time. Any worker can run a session's detector
+    # because a session has at most one frame in flight (CalculatorService holds its lock).
+    def __init__(self, detector_factory, workers=2):
+        self.detector_factory = detector_factory  # Called on a worker thread for each new session
+        self.frames = 0
+        self._requests = queue.Queue()
+        self._sessions = {}  # Session id -> _PoolSession, between open() and release()
+        self._lock = threading.Lock()
+        self._threads = [threading.Thread(target=self._run, daemon=True) for _ in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def open(self, session_id):
+        with self._lock:
+            self._sessions.setdefault(session_id, _PoolSession())
+
+    def submit(self, session_id, frame):  # Future of the landmarks (or None) for a prepared frame
+        with self._lock:
+            if session_id not in self._sessions:
+                raise KeyError(session_id)  # Released (or never opened): no new detector for it
+        future = Future()
+        self._requests.put((session_id, frame, future, time.perf_counter()))
+        return future
+
+    def release(self, session_id):  # Closes the session's detector, now or after its frame in flight
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+            if session is None:
+                return
+            session.released = True
+            idle = not session.busy
+        if idle and session.detector is not None:
+            session.detector.close()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": len(self._threads),
+                "frames": self.frames,
+                "queued": self._requests.qsize(),
+                "busy_workers": sum(session.busy for session in self._sessions.values()),
+                "detectors": sum(session.detector is not None for session in self._sessions.values()),
+            }
+
+    def close(self):
+        for _ in self._threads:
+            self._requests.put(None)
+        for thread in self._threads:
+            thread.join()
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            if session.detector is not None:
+                session.detector.close()
+
+    def _run(self):
+        while True:
+            item = self._requests.get()
+            if item is None:  # Shutdown sentinel
+                break
+            session_id, frame, future, queued_at = item
+            metrics.observe("inference_queue_wait", (time.perf_counter() - queued_at) * 1000)
+            with self._lock:
+                session = self._sessions.get(session_id)
+                if session is not None:
+                    session.busy = True
+                    self.frames += 1
+            if session is None:  # Released while the frame was queued
+                future.set_exception(KeyError(session_id))
+                continue
+            try:
+                if session.detector is None:
+                    session.detector = self.detector_factory()
+                with metrics.time("detect"):
+                    future.set_result(session.detector.detect(frame))
+            except Exception as e:
+                future.set_exception(e)
+            finally:
+                with self._lock:
+                    session.busy = False
+                    close = session.released
+                if close and session.detector is not None:
+                    session.detector.close()
+
+
+class StandInHandDetector:
+    # Replaces MediaPipe in load tests: the brightest spot is the index fingertip (the load generator
+    # draws it), after inference_ms of simulated model time. The sleep releases the GIL, unlike
+    # CPU-bound inference, so load tests with it measure the service's plumbing, not model capacity.
+    def __init__(self, inference_ms=8.0):
+        self.inference_ms = inference_ms
+
+    def detect(self, frame):
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        _, peak, _, (x, y) = cv2.minMaxLoc(gray)
+        if self.inference_ms:
+            time.sleep(self.inference_ms / 1000)
+        if peak < 128:
+            return None
+        height, width = gray.shape
+        landmarks = np.zeros((LANDMARK_COUNT, 3), dtype=np.float32)
+        landmarks[:, 0] = (x + 0.5) / width
+        landmarks[:, 1] = (y + 0.5) / height
+        return landmarks
+
+    def warm_up(self, frame_shape):
+        pass
+
+    def close(self):
+        pass
+
+# Sessions
+class ServiceSession:
+    # One kiosk: its GestureSession and the events it produced since the last response
+    def __init__(self, session_id, **options):
+        self.id = session_id
+        self.events = []
+        self.gesture = GestureSession(on_event=self.events.append, **options)
+        self.lock = threading.Lock()  # Frames of one session are processed in order
+        self.last_used = time.monotonic()
+
+    def take_events(self):
+        texts = [text for text, _ in self.events]
+        self.events.clear()  # The same list GestureSession appends to
+        return texts
+
+
+class CalculatorService:
+    SESSION_OPTIONS = ("dwell_time", "rearm_time", "smoothing")
+
+    def __init__(self, pool, display_resolution=DISPLAY_RESOLUTION, speech_backend="google", vosk_model_path=None,
+                 session_timeout=600):
+        self.pool = pool
+        self.display_resolution = display_resolution
+        self.speech_backend = speech_backend
+        self.vosk_model_path = vosk_model_path
+        self.session_timeout = session_timeout  # Idle seconds before a session is dropped
+        self._sessions = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._speech = None
+        self._speech_lock = threading.Lock()  # Loading a Vosk model must not block session lookups
+
+    def create_session(self, options=None):
+        if options is not None and not isinstance(options, dict):
+            raise ValueError("Session options must be a JSON object")
+        options = {key: value for key, value in (options or {}).items() if key in self.SESSION_OPTIONS}
+        for key in ("dwell_time", "rearm_time"):
+            if key in options and not _is_duration(options[key]):
+                raise ValueError(f"{key} must be a finite number of seconds, at least 0")
+        if "smoothing" in options and not isinstance(options["smoothing"], bool):
+            raise ValueError("smoothing must be true or false")
+        self._expire_sessions()
+        with self._lock:
+            session_id = f"s{next(self._ids)}"
+            self._sessions[session_id] = ServiceSession(session_id, **options)
+        self.pool.open(session_id)
+        return session_id
+
+    def close_session(self, session_id):
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+        if session is not None:
+            self.pool.release(session_id)
+        return session is not None
+
+    def session(self, session_id):
+        with self._lock:
+            session = self._sessions.get(session_id)
+        if session is None:
+            raise KeyError(session_id)
+        session.last_used = time.monotonic()
+        return session
+
+    def process_frame(self, session_id, jpeg, timestamp=None):
+        session = self.session(session_id)
+        with metrics.time("service_decode"):
+            frame = cv2.imdecode(np.frombuffer(jpeg, dtype=np.uint8), cv2.IMREAD_COLOR)
+            if frame is None:
+                raise ValueError("Body is not a JPEG image")
+            frame = prepare_frame(frame, self.display_resolution)
+        with session.lock:
+            landmarks = self.pool.submit(session_id, frame).result()
+            fingertip, _ = session.gesture.process_frame(frame, landmarks, timestamp)
+            return {
+                "landmarks": None if landmarks is None else landmarks.tolist(),
+                "fingertip": fingertip,
+                "phase": session.gesture.current_phase,  # Phase to draw the next frame with
+                "expression": "".join(session.gesture.selected_expression),
+                "events": session.take_events(),
+            }
+
+    def process_audio(self, session_id, wav):
+        self.session(session_id)
+        from speech_backends import wav_chunks
+        import speech_recognition as sr
+        try:
+            sample_rate, chunks = wav_chunks(io.BytesIO(wav))
+            audio = sr.AudioData(b"".join(chunks), sample_rate, 2)
+        except (wave.Error, EOFError) as e:
+            raise ValueError(f"Body is not a WAV file: {e}") from e
+        with metrics.time("voice_recognize"):
+            try:
+                transcripts = self._speech_backend().alternatives(audio)
+            except sr.UnknownValueError:
+                transcripts = []
+            except sr.RequestError as e:
+                raise RuntimeError(f"Speech recognition service unavailable: {e}") from e
+        expression = parse_voice_alternatives(transcripts) if transcripts else "Error: Could not understand the audio"
+        result = expression if "Error" in expression else evaluate_expression(expression)
+        return {"transcripts": transcripts, "expression": expression, "result": result}
+
+    def reset_session(self, session_id):
+        session = self.session(session_id)
+        with session.lock:
+            session.gesture.reset()
+
+    def stats(self):
+        with self._lock:
+            sessions = len(self._sessions)
+        return {"sessions": sessions, "inference": self.pool.stats(), "metrics": metrics.snapshot()}
+
+    def _speech_backend(self):  # Loaded on the first audio request
+        with self._speech_lock:
+            if self._speech is None:
+                from speech_backends import create_speech_backend
+                self._speech = create_speech_backend(self.speech_backend, self.vosk_model_path)
+            return self._speech
+
+    def _expire_sessions(self):
+        cutoff = time.monotonic() - self.session_timeout
+        with self._lock:
+            expired = [session_id for session_id, session in self._sessions.items() if session.last_used < cutoff]
+        for session_id in expired:
+            self.close_session(session_id)
+
+def _is_duration(value):  # JSON number (not a boolean), finite and not negative
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value) and value >= 0
+
+# HTTP Interface
+class ServiceRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, so a kiosk reuses one connection for its frames
+    disable_nagle_algorithm = True  # Headers and body go out as separate writes; don't wait on delayed ACKs
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/stats":
+            self._reply(200, self.server.service.stats())
+        else:
+            self._reply(404, {"error": "Not found"})
+
+    def do_POST(self):
+        service = self.server.service
+        parts = self.path.strip("/").split("/")
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        try:
+            if parts == ["sessions"]:
+                self._reply(201, {"session": service.create_session(json.loads(body) if body else None)})
+            elif len(parts) == 3 and parts[0] == "sessions" and parts[2] == "frames":
+                timestamp = self.headers.get("X-Timestamp")
+                with metrics.time("service_frame"):
+                    reply = service.process_frame(parts[1], body, float(timestamp) if timestamp else None)
+                self._reply(200, reply)
+            elif len(parts) == 3 and parts[0] == "sessions" and parts[2] == "audio":
+                self._reply(200, service.process_audio(parts[1], body))
+            elif len(parts) == 3 and parts[0] == "sessions" and parts[2] == "reset":
+                service.reset_session(parts[1])
+                self._reply(200, {"session": parts[1]})
+            else:
+                self._reply(404, {"error": "Not found"})
+        except KeyError:
+            self._reply(404, {"error": f"Unknown session: {parts[1]}"})
+        except ValueError as e:
+            self._reply(400, {"error": str(e)})
+        except (ImportError, RuntimeError) as e:  # Speech backend not installed, configured or reachable
+            self._reply(503, {"error": str(e)})
+        except Exception as e:
+            print(f"Service error on {self.path}: {e}")
+            self._reply(500, {"error": "Internal error"})
+
+    def do_DELETE(self):
+        parts = self.path.strip("/").split("/")
+        if len(parts) == 2 and parts[0] == "sessions" and self.server.service.close_session(parts[1]):
+            self._reply(200, {"session": parts[1]})
+        else:
+            self._reply(404, {"error": "Not found"})
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # Per-request logging would dominate at kiosk frame rates
+        pass
+
+
+def create_server(service, host="127.0.0.1", port=8765):
+    server = ThreadingHTTPServer((host, port), ServiceRequestHandler)
+    server.daemon_threads = True
+    server.service = service
+    return server
+
+# Command Line
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the gesture and voice calculator to local kiosks.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=2, help="Inference worker threads")
+    parser.add_argument("--no-motion-gating", action="store_true", help="Run inference on every frame")
+    parser.add_argument("--stand-in-detector", type=float, metavar="MS",
+                        help="Replace MediaPipe with a bright-spot detector taking MS per frame (load tests)")
+    parser.add_argument("--speech-backend", default="google", choices=["google", "vosk"])
+    parser.add_argument("--vosk-model", help="Vosk model directory")
+    args = parser.parse_args(argv)
+
+    if args.stand_in_detector is not None:
+        detector_factory = lambda: StandInHandDetector(args.stand_in_detector)
+    else:
+        def detector_factory():
+            detector = create_hand_detector(DISPLAY_RESOLUTION, motion_gated=not args.no_motion_gating)
+            detector.warm_up((DISPLAY_RESOLUTION[1], DISPLAY_RESOLUTION[0], 3))
+            return detector
+    pool = InferencePool(detector_factory, args.workers)
+    service = CalculatorService(pool, speech_backend=args.speech_backend, vosk_model_path=args.vosk_model)
+    server = create_server(service, args.host, args.port)
+    print(f"Calculator service listening on http://{args.host}:{args.port} with {args.workers} inference workers")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        pool.close()
+
+if __name__ == "__main__":
+    main()
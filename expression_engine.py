@@ -0,0 +1,216 @@
+import operator
+import re
+from decimal import Decimal
+from fractions import Fraction
+from functools import lru_cache
+
+# Tokenizer, parser and evaluator for the calculator grammar, replacing eval():
+#   expression := term (("+" | "-") term)*
+#   term       := unary (("*" | "/") unary)*
+#   unary      := ("+" | "-") unary | number | "(" expression ")"
+# Parsed expressions are cached as postfix programs; IncrementalEvaluator keeps a running
+# result while an expression is typed one token at a time.
+
+MODES = {
+    "float": lambda text: float(text) if "." in text else int(text),  # Same number types as eval()
+    "fraction": Fraction,  # Exact rationals, e.g. 7/8
+    "decimal": Decimal,  # Exact decimal literals, division rounded to the decimal context
+}
+evaluation_mode = "float"  # Mode of the calculator's results: "float" (same as eval), "fraction" or "decimal"
+BINARY_OPERATORS = {"+": operator.add, "-": operator.sub, "*": operator.mul, "/": operator.truediv}
+_TOKEN_PATTERN = re.compile(r"\s*(?:(\d+\.?\d*|\.\d+)|([-+*/()]))")
+
+
+class ExpressionError(ValueError):
+    pass
+
+
+def tokenize(expression):  # Tuple of number strings and operator/parenthesis characters
+    tokens = []
+    position = 0
+    length = len(expression)
+    while position < length:
+        match = _TOKEN_PATTERN.match(expression, position)
+        if match is None:
+            if expression[position:].isspace():
+                break
+            raise ExpressionError(f"Unexpected character {expression[position]!r} at position {position}")
+        tokens.append(match.group(1) or match.group(2))
+        position = match.end()
+    return tuple(tokens)
+
+
+@lru_cache(maxsize=256)
+def compile_expression(expression, mode="float"):
+    # Postfix program: numbers already converted for the mode, operators as callables, "neg" for unary minus
+    convert = MODES[mode]
+    tokens = tokenize(expression)
+    program = []
+    position = _parse_expression(tokens, 0, program, convert)
+    if position != len(tokens):
+        raise ExpressionError(f"Unexpected {tokens[position]!r} in {expression!r}")
+    return tuple(program)
+
+
+def _parse_expression(tokens, position, program, convert):
+    position = _parse_term(tokens, position, program, convert)
+    while position < len(tokens) and tokens[position] in "+-":
+        symbol = tokens[position]
+        position = _parse_term(tokens, position + 1, program, convert)
+        program.append(BINARY_OPERATORS[symbol])
+    return position
+
+
+def _parse_term(tokens, position, program, convert):
+    position = _parse_unary(tokens, position, program, convert)
+    while position < len(tokens) and tokens[position] in "*/":
+        symbol = tokens[position]
+        position = _parse_unary(tokens, position + 1, program, convert)
+        program.append(BINARY_OPERATORS[symbol])
+    return position
+
+
+def _parse_unary(tokens, position, program, convert):
+    if position >= len(tokens):
+        raise ExpressionError("Expression ends unexpectedly")
+    token = tokens[position]
+    if token in ("+", "-"):
+        position = _parse_unary(tokens, position + 1, program, convert)
+        if token == "-":
+            program.append("neg")
+        return position
+    if token == "(":
+        position = _parse_expression(tokens, position + 1, program, convert)
+        if position >= len(tokens) or tokens[position] != ")":
+            raise ExpressionError("Missing closing parenthesis")
+        return position + 1
+    if token in "*/)":
+        raise ExpressionError(f"Unexpected {token!r}")
+    program.append(convert(token))
+    return position + 1
+
+
+def evaluate(expression, mode="float"):
+    # Raises ExpressionError for invalid input and ZeroDivisionError for division by zero
+    stack = []
+    for step in compile_expression(expression, mode):
+        if step == "neg":
+            stack.append(-stack.pop())
+        elif callable(step):
+            right = stack.pop()
+            stack.append(step(stack.pop(), right))
+        else:
+            stack.append(step)
+    return stack[0]
+
+
+class IncrementalEvaluator:
+    # Running result for an expression that grows one token at a time (digits, ".", + - * /).
+    # Keeps the sum of finished terms and the product of the current term, so each push is O(1).
+    # Parentheses fall back to evaluate(), which re-parses through the cache.
+    def __init__(self, mode="float"):
+        self.mode = mode
+        self._convert = MODES[mode]
+        self.reset()
+
+    def reset(self):
+        self.expression = ""
+        self._total = None  # Sum of the finished terms
+        self._sign = 1  # Sign of the current term, from binary minus and unary signs
+        self._term = None  # Product of the finished factors of the current term
+        self._term_operator = None  # "*" or "/" between _term and the number being typed
+        self._digits = ""  # Number being typed
+        self._expect_operand = True  # At the start or right after an operator, so + and - are unary
+        self._invalid = False
+        self._grouped = False  # Parentheses seen, use the full parser
+
+    def push(self, text):  # Appends one or more characters, returns the running result (None if unavailable)
+        for char in text:
+            self.expression += char
+            if not (self._grouped or self._invalid):
+                self._push_char(char)
+        return self.value
+
+    def _push_char(self, char):
+        if char.isdigit() or char == ".":
+            self._digits += char
+            self._expect_operand = False
+        elif char in "+-":
+            if self._expect_operand:
+                if char == "-":
+                    self._sign = -self._sign  # Unary minus; the sign commutes with * and /
+            else:
+                self._finish_term()
+                self._sign = -1 if char == "-" else 1
+                self._expect_operand = True
+        elif char in "*/":
+            if self._expect_operand:
+                self._invalid = True
+            else:
+                self._finish_factor()
+                self._term_operator = char
+                self._expect_operand = True
+        elif char in "()":
+            self._grouped = True
+        elif not char.isspace():
+            self._invalid = True
+
+    def _factor(self):  # Current term including the number being typed
+        number = self._convert(self._digits)
+        if self._term is None:
+            return number
+        return BINARY_OPERATORS[self._term_operator](self._term, number)
+
+    def _finish_factor(self):
+        try:
+            self._term = self._factor()
+        except (ArithmeticError, ValueError):
+            self._invalid = True  # Sticky, like evaluating the finished expression would be
+        self._digits = ""
+
+    def _finish_term(self):
+        self._finish_factor()
+        if not self._invalid:
+            self._total = self._with_total(self._term)
+            self._term = None
+            self._term_operator = None
+
+    def _with_total(self, term):
+        term = term if self._sign > 0 else -term
+        return term if self._total is None else self._total + term
+
+    @property
+    def value(self):
+        if self._grouped:
+            try:
+                return evaluate(self.expression, self.mode)
+            except (ExpressionError, ArithmeticError, ValueError):
+                return None
+        if self._invalid:
+            return None
+        if self._expect_operand:  # Just typed an operator: show the result so far
+            return self._total if self._term is None else self._with_total(self._term)
+        try:
+            return self._with_total(self._factor())
+        except (ArithmeticError, ValueError):
+            return None
+
+
+# Calculator Display
+def evaluate_expression(expression, mode=None):  # "12+3 = 15", or an error message for the display
+    try:
+        result = evaluate(expression, mode or evaluation_mode)
+        return f"{expression} = {result}"
+    except ZeroDivisionError:
+        return "Error: Division by Zero"
+    except (ExpressionError, ArithmeticError) as e:
+        print(f"Error evaluating expression: {e}")
+        return "Error: Invalid expression"
+
+
+def running_result_text(expression, value):
+    return f"{expression}  ({value})"
+
+
+def strip_running_result(text):  # "12+3  (15)" -> "12+3", the part that can be edited and evaluated
+    return text.split("  (", 1)[0]
@@ -0,0 +1,59 @@
+import threading
+
+
+class LatestFrameChannel:
+    # Single-slot channel between a producer thread and a consumer.
+    # A new frame replaces any frame the consumer has not taken yet, so the
+    # consumer always sees the newest frame and memory stays bounded.
+    def __init__(self, on_ready=None):
+        self.on_ready = on_ready  # Called when a frame lands in an empty slot, e.g. a Qt signal emit
+        self._condition = threading.Condition()
+        self._frame = None
+        self._closed = False
+        self.frames_put = 0  # Total frames offered by the producer
+        self.frames_dropped = 0  # Frames replaced before the consumer took them
+
+    def put(self, frame):
+        with self._condition:
+            was_empty = self._frame is None
+            if not was_empty:
+                self.frames_dropped += 1  # Consumer fell behind, discard the stale frame
+            self._frame = frame
+            self.frames_put += 1
+            self._condition.notify()
+        # Only notify for an empty slot: a pending notification already picks up the newest frame
+        if was_empty and self.on_ready is not None:
+            self.on_ready()
+
+    def get(self, timeout=None):  # Waits for a frame; returns None on timeout or close
+        with self._condition:
+            if self._frame is None and not self._closed:
+                self._condition.wait(timeout)
+            frame, self._frame = self._frame, None
+            return frame
+
+    def get_nowait(self):
+        with self._condition:
+            frame, self._frame = self._frame, None
+            return frame
+
+    def depth(self):
+        with self._condition:
+            return 0 if self._frame is None else 1
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def close(self):  # Wakes up any waiting consumer
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def stats(self):
+        with self._condition:
+            return {
+                "frames_put": self.frames_put,
+                "frames_dropped": self.frames_dropped,
+                "depth": 0 if self._frame is None else 1,
+            }
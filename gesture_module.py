@@ -0,0 +1,235 @@
+import time
+import cv2
+from functools import lru_cache
+from bubble_layout import Bubble, BubbleLayout
+from bubble_overlay import OverlayCache
+from hand_worker import ThreadHandDetector, ProcessHandDetector, HANDS_OPTIONS, INDEX_FINGER_TIP
+from inference_scheduler import InferenceScheduler
+from roi_tracker import RoiHandTracker
+from stage_metrics import metrics
+import expression_engine
+from expression_engine import IncrementalEvaluator, evaluate_expression, running_result_text
+from selection_engine import DwellSelector, OneEuroFilter
+
+# Gesture logic shared by the Qt application (main.py) and the headless harness (headless.py).
+# Nothing here imports PySide6; per-user state lives in GestureSession instead of module globals.
+
+DISPLAY_RESOLUTION = (775, 500)  # (width, height) of the frames shown in the GUI
+bubble_radius = 45  # Radius of the interaction bubbles displayed on the webcam feed
+overlay_cache = OverlayCache()  # Pre-rendered bubble layers, invalidate after changing the layout
+
+# Number Bubble Layout
+def number_bubble_layout(width, height):
+    return _number_bubble_layout(width, height, bubble_radius)
+
+@lru_cache(maxsize=8)
+def _number_bubble_layout(width, height, radius):
+    center_x, center_y = width // 2, height // 2  # Center of the frame
+
+    # Offset values for bubble positions relative to the center
+    offset_x = width * 0.20
+    offset_y = height * 0.20
+
+    # Define positions for numbers and the transition arrow
+    number_positions = [
+        (int(center_x - offset_x), int(center_y - offset_y)),  # Top-left
+        (int(center_x), int(center_y - offset_y)),            # Top-center
+        (int(center_x + offset_x), int(center_y - offset_y)), # Top-right
+        (int(center_x - offset_x), int(center_y)),            # Middle-left
+        (int(center_x), int(center_y)),                      # Center
+        (int(center_x + offset_x), int(center_y)),            # Middle-right
+        (int(center_x - offset_x), int(center_y + offset_y)), # Bottom-left
+        (int(center_x), int(center_y + offset_y)),            # Bottom-center
+        (int(center_x + offset_x), int(center_y + offset_y)), # Bottom-right
+        (int(center_x), int(center_y + (2 * offset_y)))       # Bottom-center for "0"
+    ]
+    arrow_position = (int(center_x + (2 * offset_x)), int(center_y))  # Arrow bubble on the right
+
+    # Defining number labels
+    numbers = ["1", "2", "3", "4", "5", "6", "7", "8", "9", "0"]
+
+    bubbles = [Bubble(label, pos, radius, (52, 152, 219), font_scale=1.8)
+               for label, pos in zip(numbers, number_positions)]
+    bubbles.append(Bubble("->", arrow_position, radius, (241, 196, 15)))  # Switches to the operator phase
+    return BubbleLayout(bubbles, width, height)
+
+# Operator Bubble Layout
+def operator_bubble_layout(width, height):
+    return _operator_bubble_layout(width, height, bubble_radius)
+
+@lru_cache(maxsize=8)
+def _operator_bubble_layout(width, height, radius):
+    center_x, center_y = width // 2, height // 2  # Center of the frame
+    offset = height * 0.15  # Offset for operator positions
+
+    # Define positions for operators
+    operator_positions = [
+        (int(center_x - offset), int(center_y)),            # Left
+        (int(center_x + offset), int(center_y)),            # Right
+        (int(center_x), int(center_y - offset)),            # Top
+        (int(center_x), int(center_y + offset)),            # Bottom
+        (int(center_x), int(center_y + (2 * offset) + 20))  # "=" positioned slightly lower
+    ]
+    operators = ["+", "-", "*", "/", "="]
+
+    return BubbleLayout([Bubble(label, pos, radius, (231, 76, 60) if label == "=" else (46, 204, 113))
+                         for label, pos in zip(operators, operator_positions)], width, height)
+
+def phase_layout(phase, width, height):  # Bubbles shown and selectable in a phase
+    if phase == "select_number":
+        return number_bubble_layout(width, height)
+    return operator_bubble_layout(width, height)
+
+# Bubble Display
+def display_bubbles(frame, layout, phase):
+    height, width, _ = frame.shape
+    overlay = overlay_cache.get((phase, width, height, bubble_radius), frame.shape, layout.draw)
+    overlay.apply(frame)
+    return layout
+
+# Number Bubble Display 
+def display_number_bubbles(frame):
+    height, width, _ = frame.shape
+    return display_bubbles(frame, number_bubble_layout(width, height), "select_number")
+
+# Operator Bubble Display 
+def display_operator_bubbles(frame):
+    height, width, _ = frame.shape
+    return display_bubbles(frame, operator_bubble_layout(width, height), "select_operator")
+
+# Hand Detector Setup
+def create_hand_detector(display_resolution=DISPLAY_RESOLUTION, inference_resolution=None, roi_tracking=False,
+                         use_inference_process=False, motion_gated=True, motion_threshold=3.0, max_stride=4,
+                         extrapolate=False):
+    # In this thread or in a worker process, optionally wrapped by ROI tracking and motion gating
+    # ROI crops change position and size every frame, which MediaPipe's video-mode tracking cannot follow
+    hands_options = dict(HANDS_OPTIONS, static_image_mode=True) if roi_tracking else HANDS_OPTIONS
+    if use_inference_process:
+        inference_width, inference_height = inference_resolution or display_resolution
+        detector = ProcessHandDetector((inference_height, inference_width, 3), **hands_options)
+    else:
+        detector = ThreadHandDetector(**hands_options)
+    if inference_resolution is not None or roi_tracking:
+        detector = RoiHandTracker(detector, inference_size=inference_resolution, roi_tracking=roi_tracking)
+    if motion_gated:
+        detector = InferenceScheduler(detector, motion_threshold=motion_threshold, max_stride=max_stride,
+                                      extrapolate=extrapolate)
+    return detector
+
+def detector_stats(detector):
+    # Counters of every wrapper in the chain built by create_hand_detector, merged into one dict
+    stats = {}
+    while detector is not None:
+        if hasattr(detector, "stats"):
+            stats.update(detector.stats())
+        detector = getattr(detector, "detector", None)
+    return stats
+
+# Frame Preparation
+def prepare_frame(frame, display_resolution=DISPLAY_RESOLUTION):
+    # Flipping and resizing the frame for consistent interaction
+    with metrics.time("flip_resize"):
+        frame = cv2.flip(frame, 1)
+        return cv2.resize(frame, display_resolution)
+
+def fingertip_from_landmarks(landmarks, width, height):
+    # Getting the fingertip position in display pixels
+    if landmarks is None:
+        return None
+    index_tip = landmarks[INDEX_FINGER_TIP]
+    return int(index_tip[0] * width), int(index_tip[1] * height)
+
+# Frame Rendering
+def render_frame(frame, fingertip, phase):
+    if fingertip:
+        cv2.circle(frame, fingertip, 7, (0, 0, 255), -1)  # Red pointer for the fingertip
+    if phase == "select_number":
+        display_number_bubbles(frame)
+    elif phase == "select_operator":
+        display_operator_bubbles(frame)
+
+# Gesture Session
+class GestureSession:
+    # Phase and expression state of one user, previously the current_phase / selected_expression /
+    # last_selection_time globals. Events are (text, "gesture") tuples passed to on_event, and every
+    # selected bubble label (including "->" and "=") is passed to on_selection with its timestamp.
+    # A bubble is selected by resting the smoothed fingertip on it for dwell_time (see selection_engine).
+    def __init__(self, on_event=None, dwell_time=0.5, rearm_time=0.15, smoothing=True, show_running_result=True,
+                 on_selection=None):
+        self.on_event = on_event
+        self.on_selection = on_selection
+        self.show_running_result = show_running_result  # Append the result so far, e.g. "12+3  (15)"
+        self.current_phase = "select_number"  # Tracks current phase: "select_number", "select_operator"
+        self.selected_expression = []  # Holds the current mathematical expression
+        self.running = IncrementalEvaluator(expression_engine.evaluation_mode)  # Result so far, per label
+        self.selector = DwellSelector(dwell_time=dwell_time, rearm_time=rearm_time)
+        self.smoother = OneEuroFilter() if smoothing else None  # Fingertip jitter filter, in display pixels
+
+    def reset(self):
+        self.selected_expression = []  # Reset the expression buffer
+        self.current_phase = "select_number"  # Reset to the initial phase
+        self.running.reset()
+        self.selector.reset(hold=True)  # The finger may rest on a number bubble when the expression is cleared
+
+    def _emit(self, text):
+        if self.on_event is not None:
+            self.on_event((text, "gesture"))
+
+    def _select(self, label):
+        self.selected_expression.append(label)
+        value = self.running.push(label)
+        expression = "".join(self.selected_expression)
+        if self.show_running_result and value is not None and not expression.isdigit():
+            self._emit(running_result_text(expression, value))
+        else:
+            self._emit(expression)
+
+    def handle_selection(self, fingertip, width, height, now=None):
+        # fingertip may be None when no hand is visible, which ends any dwell in progress
+        now = time.time() if now is None else now
+        label = self.selector.update(fingertip, phase_layout(self.current_phase, width, height), now)
+        if label is None:
+            return
+        if self.on_selection is not None:
+            self.on_selection((label, now))
+        phase = self.current_phase
+
+        # Handling current phase
+        if self.current_phase == "select_number":
+            if label == "->":  # Transitioning to operator phase if arrow is selected
+                self.current_phase = "select_operator"
+            else:
+                self._select(label)
+
+        elif self.current_phase == "select_operator":
+            if label == "=":  # Evaluate expression on "=" selection
+                result = evaluate_expression("".join(self.selected_expression))
+                self._emit(result)
+                self.reset()  # Reset the expression and go back to the number phase
+            else:
+                self._select(label)
+                self.current_phase = "select_number"
+
+        if self.current_phase != phase:
+            self.selector.reset(hold=True)  # Bubbles of the new layout may sit under the finger
+
+    def process_frame(self, frame, landmarks, now=None):
+        # Selection for one prepared frame; returns the fingertip and the phase to render the frame with
+        now = time.time() if now is None else now
+        height, width = frame.shape[:2]
+        phase = self.current_phase  # Phase the frame is rendered with, before this frame's selection
+        with metrics.time("hit_test"):
+            fingertip = self.process_fingertip(fingertip_from_landmarks(landmarks, width, height), width, height, now)
+        return fingertip, phase
+
+    def process_fingertip(self, fingertip, width, height, now):
+        # Smoothing and selection for a raw fingertip in display pixels (None without a hand);
+        # returns the smoothed fingertip. Trace replay calls this directly, without frames.
+        if self.smoother is not None:
+            if fingertip is None:
+                self.smoother.reset()
+            else:
+                x, y = self.smoother(fingertip, now)
+                fingertip = int(round(x)), int(round(y))
+        self.handle_selection(fingertip, width, height, now)
+        return fingertip
@@ -1,11 +1,40 @@
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QLineEdit, QGridLayout
 )
-from PySide6.QtGui import QFont
-from PySide6.QtCore import Qt
+from PySide6.QtGui import QFont, QImage, QPainter
+from PySide6.QtCore import Qt, Signal
+from stage_metrics import metrics
+from expression_engine import evaluate_expression, strip_running_result
+
+
+class WebcamView(QLabel):
+    # Paints BGR numpy frames straight from their buffer, without a QPixmap copy per frame
+    def __init__(self):
+        super().__init__()
+        self._frame = None  # Keeps the numpy buffer alive while the QImage points into it
+        self._image = None
+
+    def set_frame(self, frame):
+        height, width, _ = frame.shape
+        self._frame = frame
+        self._image = QImage(frame.data, width, height, frame.strides[0], QImage.Format_BGR888)
+        self.update()
+
+    def paintEvent(self, event):
+        with metrics.time("gui_paint"):
+            super().paintEvent(event)  # Border and background from the stylesheet
+            if self._image is not None:
+                painter = QPainter(self)
+                painter.setClipRect(self.contentsRect())
+                painter.drawImage(self.contentsRect().topLeft(), self._image)  # Unscaled, like a QLabel pixmap
+                painter.end()
 
 
 class CalculatorGUI(QWidget):
+    frame_ready = Signal()  # Emitted from the detection thread when a new frame is waiting
+    voice_command_ready = Signal(object)  # Emitted from the voice worker with the recognized text or None
+    voice_partial_ready = Signal(str)  # Emitted from the voice worker with a partial hypothesis
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Gesture and Voice Calculator")
@@ -26,7 +55,7 @@ class CalculatorGUI(QWidget):
         self.top_layout = QHBoxLayout()
 
         # Webcam Feed
-        self.webcam_label = QLabel()
+        self.webcam_label = WebcamView()
         self.webcam_label.setFixedSize(775, 500)  
         self.webcam_label.setStyleSheet("border: 3px solid #457b9d; border-radius: 10px;")  
         self.top_layout.addWidget(self.webcam_label, alignment=Qt.AlignCenter)
@@ -139,20 +168,16 @@ class CalculatorGUI(QWidget):
         self.setLayout(self.main_layout)
 
     def button_click(self, text):
+        expression = strip_running_result(self.expression_label.text())  # Without "  (15)"
         if text == "Clear":
             self.expression_label.clear()
         elif text == "=":
-            try:
-                expression = self.expression_label.text()
-                result = str(eval(expression))
-                self.expression_label.setText(f"{expression} = {result}")
-            except Exception:
-                self.expression_label.setText("Error")
+            self.expression_label.setText(evaluate_expression(expression))
         else:
-            self.expression_label.setText(self.expression_label.text() + text)
+            self.expression_label.setText(expression + text)
 
     def update_expression(self, expression):
         self.expression_label.setText(expression)
 
-    def update_webcam_feed(self, pixmap):
-        self.webcam_label.setPixmap(pixmap)
+    def update_webcam_feed(self, frame):  # Expects a contiguous BGR uint8 frame sized for the webcam label
+        self.webcam_label.set_frame(frame)
@@ -0,0 +1,137 @@
+import multiprocessing
+import queue
+import time
+from multiprocessing import shared_memory
+import cv2
+import numpy as np
+from stage_metrics import metrics
+
+LANDMARK_COUNT = 21  # MediaPipe hand landmarks per hand
+INDEX_FINGER_TIP = 8  # mp_solutions.hands.HandLandmark.INDEX_FINGER_TIP
+# 70% confidence model; one hand, since only the last detected hand is used and a second hand makes
+# video-mode MediaPipe run palm detection on every frame while just one is visible
+HANDS_OPTIONS = {"max_num_hands": 1, "min_detection_confidence": 0.7, "min_tracking_confidence": 0.7}
+
+
+def landmarks_from_results(results):
+    # Compact (21, 3) float32 array of normalized x, y, z for the last detected hand, or None
+    if not results.multi_hand_landmarks:
+        return None
+    hand_landmarks = results.multi_hand_landmarks[-1]
+    return np.array([(lm.x, lm.y, lm.z) for lm in hand_landmarks.landmark], dtype=np.float32)
+
+
+class ThreadHandDetector:
+    # Runs MediaPipe Hands in the calling thread
+    def __init__(self, **hands_options):
+        from mediapipe import solutions as mp_solutions
+        self._hands = mp_solutions.hands.Hands(**(hands_options or HANDS_OPTIONS))
+
+    def detect(self, frame):  # Takes a BGR frame, returns landmarks or None
+        with metrics.time("color_conversion"):
+            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)  # Converting to RGB for MediaPipe
+        with metrics.time("hands_process"):
+            results = self._hands.process(rgb_frame)
+        return landmarks_from_results(results)
+
+    def warm_up(self, frame_shape):  # One untimed inference, so the first real frame skips graph initialization
+        self._hands.process(np.zeros(frame_shape, dtype=np.uint8))
+
+    def reset(self):  # Wrappers forward reset() here; MediaPipe re-validates its own tracked hand
+        pass
+
+    def close(self):
+        self._hands.close()
+
+
+def _inference_worker(shm_name, frame_shape, slots, requests, results, hands_options):
+    # Worker process: reads frames straight out of the shared ring, sends back only landmark arrays
+    shm = shared_memory.SharedMemory(name=shm_name)
+    ring = np.ndarray((slots,) + frame_shape, dtype=np.uint8, buffer=shm.buf)
+    detector = ThreadHandDetector(**hands_options)
+    try:
+        while True:
+            request = requests.get()
+            if request is None:  # Shutdown sentinel
+                break
+            seq, slot, height, width = request
+            results.put((seq, detector.detect(ring[slot, :height, :width])))
+    finally:
+        detector.close()
+        del ring
+        shm.close()
+
+
+class ProcessHandDetector:
+    # Runs MediaPipe Hands in a separate process so its Python overhead does not compete with the GUI.
+    # Frames are written into a shared-memory ring of fixed-size slots; only landmarks come back.
+    # Frames smaller than a slot (e.g. ROI crops) use its top-left corner.
+    def __init__(self, frame_shape, slots=4, result_timeout=5.0, **hands_options):
+        self.frame_shape = tuple(frame_shape)
+        self.slots = slots
+        self.result_timeout = result_timeout
+        frame_bytes = int(np.prod(self.frame_shape))
+        self._shm = shared_memory.SharedMemory(create=True, size=frame_bytes * slots)
+        self._ring = np.ndarray((slots,) + self.frame_shape, dtype=np.uint8, buffer=self._shm.buf)
+        self._next_slot = 0
+        self._seq = 0
+
+        context = multiprocessing.get_context("spawn")  # No forked copies of Qt or camera state
+        self._requests = context.Queue()
+        self._results = context.Queue()
+        self._process = context.Process(
+            target=_inference_worker,
+            args=(self._shm.name, self.frame_shape, slots, self._requests, self._results,
+                  hands_options or HANDS_OPTIONS),
+            daemon=True,
+        )
+        self._process.start()
+
+    def detect(self, frame):
+        height, width = frame.shape[:2]
+        if height > self.frame_shape[0] or width > self.frame_shape[1] or frame.shape[2:] != self.frame_shape[2:]:
+            raise ValueError(f"Frame shape {frame.shape} does not fit the ring slot shape {self.frame_shape}")
+        start = time.perf_counter()
+        landmarks = self._round_trip(frame, height, width)
+        metrics.observe("hands_process", (time.perf_counter() - start) * 1000)  # Includes the round trip
+        return landmarks
+
+    def warm_up(self, frame_shape=None):  # Waits for the worker to load the model and run one inference
+        height, width = (frame_shape or self.frame_shape)[:2]
+        self._round_trip(np.zeros((height, width) + self.frame_shape[2:], dtype=np.uint8), height, width)
+
+    def _round_trip(self, frame, height, width):
+        slot = self._next_slot
+        np.copyto(self._ring[slot, :height, :width], frame)  # The worker maps the same buffer, no pickling of pixels
+        self._next_slot = (slot + 1) % self.slots
+        self._seq += 1
+        self._requests.put((self._seq, slot, height, width))
+
+        while True:
+            try:
+                seq, landmarks = self._results.get(timeout=self.result_timeout)
+            except queue.Empty:
+                if not self._process.is_alive():
+                    raise RuntimeError("Hand inference process exited unexpectedly")
+                continue
+            if seq == self._seq:
+                return landmarks
+
+    def reset(self):
+        pass
+
+    def close(self):
+        if self._process is None:
+            return
+        self._requests.put(None)
+        self._process.join(timeout=5)
+        if self._process.is_alive():
+            self._process.terminate()
+            self._process.join()
+        self._process = None
+        self._requests.close()
+        self._results.close()
+        del self._ring
+        self._shm.close()
+        self._shm.unlink()
+        print("Hand inference process stopped.")
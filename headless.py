@@ -0,0 +1,278 @@
+import argparse
+import json
+import math
+import sys
+import time
+import tracemalloc
+import cv2
+import numpy as np
+from gesture_module import (
+    DISPLAY_RESOLUTION, GestureSession, create_hand_detector, detector_stats, prepare_frame, render_frame,
+    bubble_radius, number_bubble_layout, operator_bubble_layout
+)
+from hand_worker import LANDMARK_COUNT, INDEX_FINGER_TIP
+from landmark_trace import LandmarkTraceWriter
+
+# Headless entry point: drives the gesture pipeline from recorded videos or synthetic sources,
+# without PySide6 or a webcam, and reports throughput, latency, memory and emitted expressions.
+#   python headless.py recording.mp4 --json report.json
+#   python headless.py --synthetic-frames 300 --script "12+3="
+
+# Frame Sources
+# Sources yield (timestamp, frame) to run hand detection, or (timestamp, frame, landmarks) to bypass it.
+def video_source(path):
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise OSError(f"Unable to open video file: {path}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    try:
+        index = 0
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            yield index / fps, frame  # Video time, so selection timing matches the recording
+            index += 1
+    finally:
+        cap.release()
+
+def synthetic_frames(count, fps=30.0, size=(640, 480), seed=0):
+    # Noisy background with a moving block, so motion gating and detection see changing frames
+    rng = np.random.default_rng(seed)
+    width, height = size
+    background = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+    for index in range(count):
+        frame = background.copy()
+        x = int((index * 7) % (width - 80))
+        frame[height // 3:height // 3 + 80, x:x + 80] = (200, 170, 140)
+        yield index / fps, frame
+
+def selection_script(expression):
+    # Bubble labels to visit for an expression like "12+3=": the arrow precedes every operator
+    labels = []
+    for char in expression:
+        if char in "+-*/=":
+            labels.append("->")
+        labels.append(char)
+    return labels
+
+def scripted_source(expression, fps=30.0, travel=0.3, hover=0.65, jitter=0.0, seed=0,
+                    display_resolution=DISPLAY_RESOLUTION):
+    # Blank frames with a fingertip that moves in a straight line to the next label in `travel` seconds,
+    # crossing any bubbles on the way, and rests on it for `hover` seconds. A repeated label, or one that
+    # already sits under the finger, is reached through the resting point in the corner, since a bubble
+    # is only selected again after the finger has left it. `jitter` adds Gaussian noise (in pixels).
+    width, height = display_resolution
+    targets = dict(number_bubble_layout(width, height).centers)
+    targets.update(operator_bubble_layout(width, height).centers)
+    rest = (width * 0.05, height * 0.1)
+    reach = bubble_radius * 1.2  # Exit radius of the dwell selector around a bubble center
+
+    rng = np.random.default_rng(seed)
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+    timestamp = 0.0
+    position = rest
+    previous = None
+    for label in selection_script(expression):
+        under_finger = math.dist(position, targets[label]) <= reach
+        waypoints = [rest, targets[label]] if label == previous or under_finger else [targets[label]]
+        for waypoint in waypoints:
+            steps = max(int(travel * fps), 1)
+            for step in range(1, steps + 1):
+                point = _lerp(position, waypoint, step / steps)
+                yield timestamp, frame.copy(), _landmarks_at(point, width, height, rng, jitter)
+                timestamp += 1 / fps
+            position = waypoint
+        for _ in range(max(int(hover * fps), 1)):
+            yield timestamp, frame.copy(), _landmarks_at(position, width, height, rng, jitter)
+            timestamp += 1 / fps
+        previous = label
+
+def _lerp(start, end, fraction):
+    return start[0] + (end[0] - start[0]) * fraction, start[1] + (end[1] - start[1]) * fraction
+
+def _landmarks_at(position, width, height, rng=None, jitter=0.0):
+    if position is None:
+        return None
+    x, y = position
+    if jitter:
+        x, y = x + rng.normal(0, jitter), y + rng.normal(0, jitter)
+    landmarks = np.zeros((LANDMARK_COUNT, 3), dtype=np.float32)
+    landmarks[:, 0] = (x + 0.5) / width
+    landmarks[:, 1] = (y + 0.5) / height
+    landmarks[INDEX_FINGER_TIP, 2] = -0.05
+    return landmarks
+
+# Pipeline Run
+def percentile(sorted_values, quantile):  # Nearest-rank, same as the stage metrics histograms
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(int(quantile * len(sorted_values)), len(sorted_values) - 1)]
+
+def run_pipeline(source, detector=None, display_resolution=DISPLAY_RESOLUTION, render=True,
+                 dwell_time=0.5, rearm_time=0.15, smoothing=True, expected=None, trace_memory=False, trace=None):
+    # expected: expression the user meant to enter, e.g. "12+3=", to report the selection error rate;
+    # trace: LandmarkTraceWriter that records every frame's landmarks for replay
+    events = []
+    selections = []
+    session = GestureSession(on_event=events.append, dwell_time=dwell_time, rearm_time=rearm_time,
+                             smoothing=smoothing, on_selection=selections.append)
+    latencies = []
+    first_timestamp = last_timestamp = None
+
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    for item in source:
+        frame_start = time.perf_counter()
+        timestamp, frame = item[0], prepare_frame(item[1], display_resolution)
+        if first_timestamp is None:
+            first_timestamp = timestamp
+        last_timestamp = timestamp
+        landmarks = item[2] if len(item) > 2 else detector.detect(frame)
+        if trace is not None:
+            trace.write(timestamp, landmarks)
+        fingertip, phase = session.process_frame(frame, landmarks, now=timestamp)
+        if render:
+            render_frame(frame, fingertip, phase)
+        latencies.append((time.perf_counter() - frame_start) * 1000)
+    elapsed = time.perf_counter() - start
+
+    report = {
+        "frames": len(latencies),
+        "seconds": elapsed,
+        "fps": len(latencies) / elapsed if elapsed else 0.0,
+        "latency_ms": {},
+        "process_peak_rss_mb": _peak_rss_mb(),  # Whole process so far, includes earlier sources of the run
+        "expressions": [text for text, _ in events],
+    }
+    report.update(selection_stats(selections, first_timestamp, last_timestamp, expected))
+    latencies.sort()
+    for quantile in (0.5, 0.95, 0.99):
+        report["latency_ms"][f"p{int(quantile * 100)}"] = percentile(latencies, quantile)
+    report["latency_ms"]["max"] = latencies[-1] if latencies else 0.0
+    if detector is not None:
+        report["detector"] = detector_stats(detector)  # Counters over the detector's lifetime, e.g. ROI hits
+    if trace_memory:
+        report["peak_traced_mb"] = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+    return report
+
+def selection_stats(selections, first_timestamp, last_timestamp, expected=None):
+    # Input throughput over the session time (video or script time, not processing time) and,
+    # given the intended expression, the edit distance of the selected labels per intended label
+    labels = [label for label, _ in selections]
+    minutes = (last_timestamp - first_timestamp) / 60 if selections and last_timestamp > first_timestamp else 0.0
+    stats = {
+        "selections": len(labels),
+        "selections_per_minute": len(labels) / minutes if minutes else 0.0,
+    }
+    if expected is not None:
+        intended = selection_script(expected)
+        stats["selection_errors"] = edit_distance(intended, labels)
+        stats["error_rate"] = stats["selection_errors"] / len(intended) if intended else 0.0
+    return stats
+
+def edit_distance(reference, hypothesis):  # Levenshtein distance over labels
+    row = list(range(len(hypothesis) + 1))
+    for i, ref_label in enumerate(reference, 1):
+        previous, row[0] = row[0], i
+        for j, hyp_label in enumerate(hypothesis, 1):
+            previous, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, previous + (ref_label != hyp_label))
+    return row[-1]
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Not available on Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10  # Bytes on macOS, KiB on Linux
+
+def format_report(name, report):
+    latency = report["latency_ms"]
+    text = (f"{name}: {report['frames']} frames, {report['fps']:.1f} fps, "
+            f"latency p50 {latency['p50']:.2f} / p95 {latency['p95']:.2f} / p99 {latency['p99']:.2f} ms, "
+            f"{report['selections_per_minute']:.1f} selections/min")
+    if "error_rate" in report:
+        text += f" ({report['error_rate']:.1%} errors)"
+    detector = report.get("detector", {})
+    if "roi_hits" in detector:
+        text += (f", ROI {detector['roi_hits']} hits / {detector['roi_misses']} misses "
+                 f"({detector['roi_hit_ratio']:.1%})")
+    if "inferences" in detector:
+        text += f", inference on {detector['inferences']} of {detector['frames']} frames"
+    return text + f", expressions {report['expressions']}"
+
+# Command Line
+def parse_resolution(text):
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the gesture pipeline headless and report performance.")
+    parser.add_argument("videos", nargs="*", help="Recorded video files to run through hand detection")
+    parser.add_argument("--synthetic-frames", type=int, default=0, help="Also run N synthetic frames through detection")
+    parser.add_argument("--script", help="Also replay a scripted fingertip entering an expression, e.g. '12+3='")
+    parser.add_argument("--expected", help="Expression entered in the videos, e.g. '12+3=', to report the error rate")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Pixels of fingertip noise in the scripted replay")
+    parser.add_argument("--hover", type=float, default=0.65, help="Seconds the scripted fingertip rests on each bubble")
+    parser.add_argument("--dwell-time", type=float, default=0.5, help="Seconds on a bubble to select it")
+    parser.add_argument("--rearm-time", type=float, default=0.15, help="Seconds off a bubble before it re-arms")
+    parser.add_argument("--no-smoothing", action="store_true", help="Use the raw fingertip for selection")
+    parser.add_argument("--inference-resolution", type=parse_resolution, help="WIDTHxHEIGHT for hand inference")
+    parser.add_argument("--roi-tracking", action="store_true", help="Track the hand with ROI crops")
+    parser.add_argument("--inference-process", action="store_true", help="Run MediaPipe in a worker process")
+    parser.add_argument("--no-motion-gating", action="store_true", help="Run inference on every frame")
+    parser.add_argument("--extrapolate", action="store_true", help="Extrapolate landmarks on skipped frames")
+    parser.add_argument("--no-render", action="store_true", help="Skip drawing the pointer and bubbles")
+    parser.add_argument("--trace-memory", action="store_true", help="Report peak Python allocations per source (slower)")
+    parser.add_argument("--json", help="Write the reports to this JSON file")
+    parser.add_argument("--record-trace", help="Record the landmarks of a single source to this trace file")
+    args = parser.parse_args(argv)
+
+    # (name, source factory, intended expression)
+    sources = [(path, lambda path=path: video_source(path), args.expected) for path in args.videos]
+    if args.synthetic_frames:
+        sources.append((f"synthetic[{args.synthetic_frames}]", lambda: synthetic_frames(args.synthetic_frames), None))
+    needs_detector = bool(sources)
+    if args.script:
+        sources.append((f"script[{args.script}]",
+                        lambda: scripted_source(args.script, jitter=args.jitter, hover=args.hover), args.script))
+    if not sources:
+        parser.error("nothing to run: pass video files, --synthetic-frames or --script")
+    if args.record_trace and len(sources) > 1:
+        parser.error("--record-trace records a single source")
+
+    detector = None
+    if needs_detector:
+        start = time.perf_counter()
+        detector = create_hand_detector(DISPLAY_RESOLUTION, args.inference_resolution, args.roi_tracking,
+                                        args.inference_process, not args.no_motion_gating,
+                                        extrapolate=args.extrapolate)
+        width, height = DISPLAY_RESOLUTION
+        detector.warm_up((height, width, 3))  # Model load and first inference stay out of the frame latencies
+        print(f"Hand detector ready in {(time.perf_counter() - start) * 1000:.0f} ms")
+    trace = LandmarkTraceWriter(args.record_trace, DISPLAY_RESOLUTION) if args.record_trace else None
+    reports = {}
+    try:
+        for name, make_source, expected in sources:
+            reports[name] = run_pipeline(make_source(), detector, render=not args.no_render,
+                                         dwell_time=args.dwell_time, rearm_time=args.rearm_time,
+                                         smoothing=not args.no_smoothing, expected=expected,
+                                         trace_memory=args.trace_memory, trace=trace)
+            print(format_report(name, reports[name]))
+    finally:
+        if detector is not None:
+            detector.close()
+        if trace is not None:
+            trace.close()
+            print(f"Recorded {trace.frames} frames to {args.record_trace}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(reports, f, indent=2)
+    return reports
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import time
+import cv2
+import numpy as np
+
+
+class InferenceScheduler:
+    # Sits in front of a hand detector and skips inference while the scene is static.
+    # Frames are compared as small area-averaged thumbnails against the frame that was last
+    # inferred; below the motion threshold the previous landmarks are reused (or extrapolated),
+    # and an inference is forced at least every max_stride frames.
+    def __init__(self, detector, motion_threshold=3.0, max_stride=4, thumbnail_size=(48, 32), extrapolate=False):
+        self.detector = detector
+        self.motion_threshold = motion_threshold  # Mean absolute pixel difference (0-255) counted as motion
+        self.max_stride = max_stride  # Maximum frames served from the last result before a forced inference
+        self.thumbnail_size = thumbnail_size
+        self.extrapolate = extrapolate  # Linearly extrapolate landmarks instead of repeating them
+        self.frames = 0
+        self.inferences = 0
+        self.skipped = 0
+        self._reference = None  # Thumbnail of the last inferred frame
+        self._since_inference = 0
+        self._landmarks = None
+        self._velocity = None  # Landmark change per frame between the last two inferences
+        self._started = time.perf_counter()
+
+    def detect(self, frame):
+        self.frames += 1
+        thumbnail = cv2.resize(frame, self.thumbnail_size, interpolation=cv2.INTER_AREA).astype(np.int16)
+
+        if self._reference is not None and self._since_inference < self.max_stride:
+            motion = float(np.mean(np.abs(thumbnail - self._reference)))
+            if motion < self.motion_threshold:
+                self._since_inference += 1
+                self.skipped += 1
+                return self._predicted()
+
+        landmarks = self.detector.detect(frame)
+        self.inferences += 1
+        if landmarks is not None and self._landmarks is not None:
+            self._velocity = (landmarks - self._landmarks) / (self._since_inference + 1)
+        else:
+            self._velocity = None
+        self._landmarks = landmarks
+        self._reference = thumbnail
+        self._since_inference = 0
+        return landmarks
+
+    def _predicted(self):
+        if self._landmarks is None or not self.extrapolate or self._velocity is None:
+            return self._landmarks
+        return self._landmarks + self._velocity * self._since_inference
+
+    def warm_up(self, frame_shape):  # Not counted in the stats
+        self.detector.warm_up(frame_shape)
+
+    def reset(self):  # Forget the last result, e.g. after gestures were disabled for a while
+        self._reference = None
+        self._landmarks = None
+        self._velocity = None
+        self._since_inference = 0
+        self.detector.reset()
+
+    def stats(self):
+        elapsed = max(time.perf_counter() - self._started, 1e-9)
+        return {
+            "frames": self.frames,
+            "inferences": self.inferences,
+            "skipped": self.skipped,
+            "inference_ratio": self.inferences / self.frames if self.frames else 0.0,
+            "inferences_per_second": self.inferences / elapsed,
+        }
+
+    def close(self):
+        self.detector.close()
@@ -0,0 +1,144 @@
+import argparse
+import struct
+import time
+import numpy as np
+from hand_worker import LANDMARK_COUNT, INDEX_FINGER_TIP
+
+# Landmark traces: per-frame timestamps and hand landmarks recorded from the gesture pipeline,
+# replayed into GestureSession without MediaPipe, frames or a webcam.
+#
+# File layout (little-endian):
+#   header  HEADER_SIZE bytes: magic, version, header size, landmark count, display width, height
+#   records one TRACE_DTYPE record per processed frame, back to back, so the file can be memory-mapped
+#           as a structured array; a record cut short by a crash is ignored when reading.
+#   python landmark_trace.py session.trace --dwell-time 0.4 --expected "12+3="
+
+MAGIC = b"GVCTRACE"
+VERSION = 1
+HEADER_SIZE = 32
+_HEADER = struct.Struct("<8sHHHHH")
+TRACE_DTYPE = np.dtype([
+    ("timestamp", "<f8"),  # Seconds, the time the frame was processed at
+    ("has_hand", "u1"),  # 0 when no hand was detected; the landmarks are zeros then
+    ("landmarks", "<f4", (LANDMARK_COUNT, 3)),  # Normalized x, y, z in the display frame
+])
+
+
+class LandmarkTraceWriter:
+    # Appends records through a preallocated buffer, written out every buffer_frames frames or after
+    # flush_interval seconds, whichever comes first, so a crash loses at most about a second of frames
+    def __init__(self, path, display_resolution, buffer_frames=256, flush_interval=1.0):
+        width, height = display_resolution
+        self.path = path
+        self.frames = 0
+        self._file = open(path, "wb")
+        self._file.write(_HEADER.pack(MAGIC, VERSION, HEADER_SIZE, LANDMARK_COUNT, width, height)
+                         .ljust(HEADER_SIZE, b"\0"))
+        self._buffer = np.zeros(buffer_frames, dtype=TRACE_DTYPE)
+        self._pending = 0
+        self.flush_interval = flush_interval
+        self._flushed_at = time.monotonic()  # Wall time, independent of the recorded timestamps
+
+    def write(self, timestamp, landmarks):
+        record = self._buffer[self._pending]
+        record["timestamp"] = timestamp
+        if landmarks is None:
+            record["has_hand"] = 0
+            record["landmarks"] = 0
+        else:
+            record["has_hand"] = 1
+            record["landmarks"] = landmarks
+        self._pending += 1
+        self.frames += 1
+        if self._pending == len(self._buffer) or time.monotonic() - self._flushed_at >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        if self._pending:
+            self._file.write(self._buffer[:self._pending].tobytes())
+            self._pending = 0
+        self._file.flush()
+        self._flushed_at = time.monotonic()
+
+    def close(self):
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_trace(path):
+    # (display_resolution, records): records is a read-only memory-mapped TRACE_DTYPE array
+    with open(path, "rb") as f:
+        header = f.read(HEADER_SIZE)
+        f.seek(0, 2)
+        size = f.tell()
+    if len(header) < HEADER_SIZE:
+        raise ValueError(f"{path}: not a landmark trace (file too short)")
+    magic, version, header_size, landmark_count, width, height = _HEADER.unpack_from(header)
+    if magic != MAGIC:
+        raise ValueError(f"{path}: not a landmark trace")
+    if version != VERSION or landmark_count != LANDMARK_COUNT:
+        raise ValueError(f"{path}: unsupported trace version {version} with {landmark_count} landmarks")
+    count = (size - header_size) // TRACE_DTYPE.itemsize
+    if count == 0:
+        return (width, height), np.zeros(0, dtype=TRACE_DTYPE)
+    return (width, height), np.memmap(path, dtype=TRACE_DTYPE, mode="r", offset=header_size, shape=(count,))
+
+
+def replay_trace(records, session, display_resolution):
+    # Feeds recorded fingertips into a GestureSession at the recorded timestamps; returns frames per second.
+    # Fingertips are converted for the whole trace at once, exactly as fingertip_from_landmarks does per frame.
+    width, height = display_resolution
+    tips = records["landmarks"][:, INDEX_FINGER_TIP]
+    xs = (tips[:, 0] * width).astype(np.int64).tolist()
+    ys = (tips[:, 1] * height).astype(np.int64).tolist()
+    has_hand = records["has_hand"].tolist()
+    timestamps = records["timestamp"].tolist()
+
+    process = session.process_fingertip
+    start = time.perf_counter()
+    for timestamp, hand, x, y in zip(timestamps, has_hand, xs, ys):
+        process((x, y) if hand else None, width, height, timestamp)
+    elapsed = time.perf_counter() - start
+    return len(timestamps) / elapsed if elapsed else 0.0
+
+
+def main(argv=None):
+    from gesture_module import GestureSession
+    from headless import selection_stats
+
+    parser = argparse.ArgumentParser(description="Replay a landmark trace through the selection logic.")
+    parser.add_argument("trace", help="Trace written with landmark_trace_path in main.py or --record-trace")
+    parser.add_argument("--dwell-time", type=float, default=0.5, help="Seconds on a bubble to select it")
+    parser.add_argument("--rearm-time", type=float, default=0.15, help="Seconds off a bubble before it re-arms")
+    parser.add_argument("--no-smoothing", action="store_true", help="Use the raw fingertip for selection")
+    parser.add_argument("--expected", help="Expression entered in the session, e.g. '12+3=', to report the error rate")
+    args = parser.parse_args(argv)
+
+    display_resolution, records = read_trace(args.trace)
+    events, selections = [], []
+    session = GestureSession(on_event=events.append, dwell_time=args.dwell_time, rearm_time=args.rearm_time,
+                             smoothing=not args.no_smoothing, on_selection=selections.append)
+    fps = replay_trace(records, session, display_resolution)
+    first, last = (records["timestamp"][0], records["timestamp"][-1]) if len(records) else (0.0, 0.0)
+    stats = selection_stats(selections, float(first), float(last), args.expected)
+
+    print(f"{len(records)} frames ({last - first:.1f} s of use) replayed at {fps:.0f} frames/s")
+    text = f"{stats['selections']} selections, {stats['selections_per_minute']:.1f} selections/min"
+    if "error_rate" in stats:
+        text += f", {stats['error_rate']:.1%} errors"
+    print(text)
+    print(f"Final phase {session.current_phase}, expression '{''.join(session.selected_expression)}'")
+    for text, _ in events:
+        print(f"  {text}")
+    return stats
+
+if __name__ == "__main__":
+    main()
@@ -1,277 +1,392 @@
+import time
+startup_started = time.perf_counter()  # Startup phases are reported relative to this
+
 import threading
 import queue
-import cv2
-import time
-import numpy as np
 from PySide6.QtWidgets import QApplication
-from PySide6.QtGui import QImage, QPixmap
-from PySide6.QtCore import QTimer
-from mediapipe import solutions as mp_solutions
+from PySide6.QtCore import Qt, QTimer
 from gui import CalculatorGUI
-from voice_module import VoiceRecognizer
+from voice_grammar import parse_voice_alternatives, parse_voice_command
+from expression_engine import evaluate_expression
+from frame_channel import LatestFrameChannel
+from stage_metrics import metrics
+# cv2, MediaPipe and speech_recognition are imported by the startup stage once the window is shown
 
 # Globals to manage the state of the application
 stop_threads = False  # Signals threads to stop gracefully when the app closes
-command_queue = queue.Queue()  # Queue for communication between the detection thread and GUI
+capture_channel = LatestFrameChannel()  # Newest raw webcam frame for the inference stage
+render_channel = LatestFrameChannel()  # Newest (frame, fingertip, phase) for the render stage
+frame_channel = LatestFrameChannel()  # Newest annotated frame for the GUI, stale frames are dropped
+event_queue = queue.Queue(maxsize=32)  # Small lossless queue for expression/result events
 gesture_detection_active = False  # Keeps track of whether gesture detection is active
-current_phase = "select_number"  # Tracks current phase: "select_number", "select_operator", "evaluate"
-selected_expression = []  # Holds the current mathematical expression
-selection_buffer_time = 2  # Minimum time between valid selections (in seconds)
-last_selection_time = 0  # Timestamp of the last valid selection
-bubble_radius = 45  # Radius of the interaction bubbles displayed on the webcam feed
-
-# Number Bubble Display 
-def display_number_bubbles(frame):
-    height, width, _ = frame.shape
-    center_x, center_y = width // 2, height // 2  # Center of the frame
-
-    # Offset values for bubble positions relative to the center
-    offset_x = width * 0.20
-    offset_y = height * 0.20
-
-    # Define positions for numbers and the transition arrow
-    number_positions = [
-        (int(center_x - offset_x), int(center_y - offset_y)),  # Top-left
-        (int(center_x), int(center_y - offset_y)),            # Top-center
-        (int(center_x + offset_x), int(center_y - offset_y)), # Top-right
-        (int(center_x - offset_x), int(center_y)),            # Middle-left
-        (int(center_x), int(center_y)),                      # Center
-        (int(center_x + offset_x), int(center_y)),            # Middle-right
-        (int(center_x - offset_x), int(center_y + offset_y)), # Bottom-left
-        (int(center_x), int(center_y + offset_y)),            # Bottom-center
-        (int(center_x + offset_x), int(center_y + offset_y)), # Bottom-right
-        (int(center_x), int(center_y + (2 * offset_y)))       # Bottom-center for "0"
-    ]
-    arrow_position = (int(center_x + (2 * offset_x)), int(center_y))  # Arrow bubble on the right
-
-    # Defining number labels
-    numbers = ["1", "2", "3", "4", "5", "6", "7", "8", "9", "0"]
-
-    # Adding the number bubbles
-    for i, pos in enumerate(number_positions):
-        cv2.circle(frame, pos, bubble_radius, (52, 152, 219), -1) 
-        text_size = cv2.getTextSize(numbers[i], cv2.FONT_HERSHEY_DUPLEX, 1.4, 3)[0]
-        text_x = pos[0] - text_size[0] // 2
-        text_y = pos[1] + text_size[1] // 2
-        cv2.putText(frame, numbers[i], (text_x, text_y),
-                    cv2.FONT_HERSHEY_DUPLEX, 1.8, (255, 255, 255), 3)  
-
-    # Adding the arrow bubble
-    cv2.circle(frame, arrow_position, bubble_radius, (241, 196, 15), -1)  
-    arrow_text = "->"
-    text_size = cv2.getTextSize(arrow_text, cv2.FONT_HERSHEY_DUPLEX, 1.4, 3)[0]
-    text_x = arrow_position[0] - text_size[0] // 2
-    text_y = arrow_position[1] + text_size[1] // 2
-    cv2.putText(frame, arrow_text, (text_x, text_y),
-                cv2.FONT_HERSHEY_DUPLEX, 1.4, (255, 255, 255), 3)  
-
-    return number_positions, numbers, arrow_position
-
-# Operator Bubble Display 
-def display_operator_bubbles(frame):
-    height, width, _ = frame.shape
-    center_x, center_y = width // 2, height // 2  # Center of the frame
-    offset = height * 0.15  # Offset for operator positions
-
-    # Define positions for operators
-    operator_positions = [
-        (int(center_x - offset), int(center_y)),            # Left
-        (int(center_x + offset), int(center_y)),            # Right
-        (int(center_x), int(center_y - offset)),            # Top
-        (int(center_x), int(center_y + offset)),            # Bottom
-        (int(center_x), int(center_y + (2 * offset) + 20))  # "=" positioned slightly lower
-    ]
-    operators = ["+", "-", "*", "/", "="]
-
-    # Adding the operator bubbles
-    for i, pos in enumerate(operator_positions):
-        color = (231, 76, 60) if operators[i] == "=" else (46, 204, 113)  
-        cv2.circle(frame, pos, bubble_radius, color, -1)
-        text_size = cv2.getTextSize(operators[i], cv2.FONT_HERSHEY_DUPLEX, 1.4, 3)[0]
-        text_x = pos[0] - text_size[0] // 2
-        text_y = pos[1] + text_size[1] // 2
-        cv2.putText(frame, operators[i], (text_x, text_y),
-                    cv2.FONT_HERSHEY_DUPLEX, 1.4, (255, 255, 255), 3) 
-
-    return operator_positions, operators
-
-# Gesture Detection 
-def run_gesture_detection():
-    global stop_threads, gesture_detection_active, current_phase, selected_expression, last_selection_time
-
-    # Initializing MediaPipe's hand detection model
-    hands = mp_solutions.hands.Hands(min_detection_confidence=0.7, min_tracking_confidence=0.7) #70% confidence model
-    cap = cv2.VideoCapture(0)  # Open the webcam
-
+gesture_enabled = threading.Event()  # Set while gesture detection is active, wakes the idle capture stage
+detector_reset_requested = threading.Event()  # Set on re-enable, so no landmarks from before the pause are reused
+session_reset_requested = threading.Event()  # Set by "Clear"; the gesture thread resets the session it owns
+release_camera_when_idle = False  # Release the webcam while gestures are disabled (slower to re-enable)
+display_resolution = (775, 500)  # (width, height) of the frames shown in the GUI
+inference_resolution = None  # (width, height) hand inference runs at, None uses the display resolution
+roi_tracking = False  # Experimental: inference on a crop around the last hand, not measured faster yet
+use_inference_process = False  # Run MediaPipe Hands in a worker process fed through shared memory
+motion_gated_inference = True  # Reuse the last landmarks while the scene is static
+motion_threshold = 3.0  # Mean thumbnail pixel difference that counts as motion
+max_inference_stride = 4  # Force an inference at least every N frames
+motion_extrapolation = False  # Extrapolate skipped frames' landmarks from the last two inferences
+dwell_time = 0.5  # Seconds the fingertip rests on a bubble to select it
+rearm_time = 0.15  # Seconds off a selected bubble before it can be selected again
+smooth_fingertip = True  # One Euro filter on the fingertip before hit testing
+landmark_trace_path = None  # e.g. "session.trace", records hand landmarks for replay with landmark_trace.py
+show_latency_hud = False  # Draw FPS and stage latencies on the webcam feed
+metrics_json_path = None  # e.g. "metrics.json", rewritten every metrics_export_interval seconds
+metrics_prometheus_path = None  # e.g. "metrics.prom", Prometheus text format for the node exporter
+metrics_export_interval = 10  # Seconds between metric exports
+detector_stats_interval = 1.0  # Seconds between updates of the hand inference gauges
+speech_backend = "google"  # "google" (online) or "vosk" (offline, calculator vocabulary only)
+vosk_model_path = None  # Directory of a Vosk model, e.g. "models/vosk-model-small-en-us-0.15"
+warm_up_camera = True  # Open the webcam during startup instead of on the first "Activate Gestures"
+gestures_on_start = False  # Start with gesture detection enabled, e.g. on kiosks
+gesture_session = None  # Phase and expression of the kiosk user, created by the startup stage
+voice_worker = None  # Background voice listener, created by the startup stage
+voice_startup_error = None  # Why the voice listener could not be created, shown when voice is requested
+gesture_startup_error = None  # Why the hand detector could not be created, shown when gestures are activated
+stage_threads = []  # Capture, gesture detection and render threads, started by the startup stage
+
+# Posting events without losing them, while still noticing shutdown if the GUI stops draining
+def post_event(event):
+    while not stop_threads:
+        try:
+            event_queue.put(event, timeout=0.1)
+            return
+        except queue.Full:
+            continue
+
+# Startup phases, in milliseconds since launch, as gauges and on the console
+def mark_startup(phase):
+    elapsed = (time.perf_counter() - startup_started) * 1000
+    metrics.set_gauge(f"startup_{phase}_ms", elapsed)
+    print(f"Startup: {phase} after {elapsed:.0f} ms")
+
+def open_camera():  # Webcam for the capture stage, or None if it cannot be opened yet
+    import cv2
+    cap = cv2.VideoCapture(0)
     if not cap.isOpened():
-        print("Error: Unable to access the webcam.")
-        return
+        cap.release()
+        return None  # The capture stage retries and reports the error when gestures are enabled
+    mark_startup("camera_ready")
+    return cap
+
+# Startup Stage
+def run_startup(calculator):
+    # Runs once the window is shown: starts the voice worker, loads the gesture modules, warms up the
+    # hand detector with one dummy inference and opens the webcam, then starts the pipeline stages
+    global gesture_session, voice_worker, voice_startup_error, gesture_startup_error
+    try:
+        from voice_module import VoiceWorker
+        from speech_backends import create_speech_backend
+        voice_worker = VoiceWorker(on_result=calculator.voice_command_ready.emit,
+                                   backend=create_speech_backend(speech_backend, vosk_model_path),
+                                   on_partial=calculator.voice_partial_ready.emit)
+        voice_worker.start()  # Calibrates in its own thread
+        mark_startup("voice_started")
+    except Exception as e:
+        voice_startup_error = e
+        print(f"Voice startup failed: {e}")
 
+    opened = []  # Webcam opened next to the model warm-up, both take a while on cold start
+    camera_thread = threading.Thread(target=lambda: opened.append(open_camera()), daemon=True)
+    detector = None
+    try:
+        from gesture_module import GestureSession, create_hand_detector
+        mark_startup("gesture_imports")
+        if warm_up_camera and not release_camera_when_idle:
+            camera_thread.start()
+        gesture_session = GestureSession(on_event=post_event, dwell_time=dwell_time, rearm_time=rearm_time,
+                                         smoothing=smooth_fingertip)
+        # Initializing MediaPipe's hand detection model, in this thread or in a worker process
+        detector = create_hand_detector(display_resolution, inference_resolution, roi_tracking,
+                                        use_inference_process, motion_gated_inference, motion_threshold,
+                                        max_inference_stride, motion_extrapolation)
+        width, height = display_resolution
+        with metrics.time("model_warm_up"):
+            detector.warm_up((height, width, 3))
+        mark_startup("model_ready")
+    except Exception as e:
+        gesture_startup_error = e
+        print(f"Gesture startup failed: {e}")
+        if detector is not None:
+            detector.close()
+        detector = None
+    if camera_thread.is_alive():
+        camera_thread.join()
+    cap = opened[0] if opened else None
+
+    if stop_threads or detector is None:  # Window closed during startup, or no hand detector
+        if cap is not None:
+            cap.release()
+        if detector is not None:
+            detector.close()
+        return
+    for target, args in ((run_capture, (cap,)), (run_gesture_detection, (detector,)), (run_render, ())):
+        thread = threading.Thread(target=target, args=args, daemon=True)
+        thread.start()
+        stage_threads.append(thread)
+
+# Capture Stage
+def run_capture(cap=None):  # cap: webcam already opened by the startup stage, if any
+    import cv2
     try:
         while not stop_threads:
-            ret, frame = cap.read()
+            if not gesture_detection_active:
+                # Idle mode: stop reading frames (and optionally release the webcam) until gestures are enabled
+                if cap is not None and release_camera_when_idle:
+                    cap.release()
+                    cap = None
+                    print("Webcam released while gesture detection is disabled.")
+                gesture_enabled.wait(timeout=0.5)
+                continue
+
+            if cap is None:
+                cap = cv2.VideoCapture(0)  # Open the webcam
+                if not cap.isOpened():
+                    print("Error: Unable to access the webcam.")
+                    return
+
+            with metrics.time("capture"):
+                ret, frame = cap.read()
             if not ret:
                 break
-
-            if gesture_detection_active:
-                # Flipping and resizing the frame for consistent interaction
-                frame = cv2.flip(frame, 1)
-                frame = cv2.resize(frame, (775, 500))
-                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)  # Converting to RGB for MediaPipe
-                results = hands.process(rgb_frame)  # Detecting hands
-
-                # Getting the fingertip position
-                index_tip = None
-                if results.multi_hand_landmarks:
-                    for hand_landmarks in results.multi_hand_landmarks:
-                        index_tip = hand_landmarks.landmark[mp_solutions.hands.HandLandmark.INDEX_FINGER_TIP]
-                        x, y = int(index_tip.x * frame.shape[1]), int(index_tip.y * frame.shape[0])
-                        cv2.circle(frame, (x, y), 7, (0, 0, 255), -1)  # Red pointer for the fingertip
-
-                # Handling current phase
-                if current_phase == "select_number":
-                    positions, labels, arrow_position = display_number_bubbles(frame)
-                    if index_tip:
-                        for i, pos in enumerate(positions):
-                            if abs(pos[0] - x) < bubble_radius and abs(pos[1] - y) < bubble_radius: #Finding nearest number bubble
-                                if time.time() - last_selection_time > selection_buffer_time:
-                                    selected_expression.append(labels[i])
-                                    command_queue.put(("".join(selected_expression), "gesture"))
-                                    last_selection_time = time.time()
-                                    break
-                        # Transitioning to operator phase if arrow is selected
-                        if abs(arrow_position[0] - x) < bubble_radius and abs(arrow_position[1] - y) < bubble_radius:
-                            if time.time() - last_selection_time > selection_buffer_time:
-                                current_phase = "select_operator"
-                                last_selection_time = time.time()
-
-                elif current_phase == "select_operator":
-                    positions, labels = display_operator_bubbles(frame)
-                    if index_tip:
-                        for i, pos in enumerate(positions):
-                            if abs(pos[0] - x) < bubble_radius and abs(pos[1] - y) < bubble_radius:
-                                if time.time() - last_selection_time > selection_buffer_time:
-                                    if labels[i] == "=":  # Evaluate expression on "=" selection
-                                        result = evaluate_expression("".join(selected_expression))
-                                        command_queue.put((result, "gesture"))
-                                        selected_expression = []  # Reset the expression
-                                        current_phase = "select_number"  # Reset to number phase
-                                    else:
-                                        selected_expression.append(labels[i])
-                                        command_queue.put(("".join(selected_expression), "gesture"))
-                                        current_phase = "select_number"
-                                    last_selection_time = time.time()
-                                    break
-
-                command_queue.put((frame, "frame"))  # Send the updated frame to the queue
+            capture_channel.put((frame, time.perf_counter()))  # Inference always picks up the newest frame
     finally:
-        cap.release()
-        print("Webcam released and thread exited.")
-
-# Expression Evaluation 
-def evaluate_expression(expression):
-    try:
-        result = eval(expression)
-        return f"{expression} = {result}"
-    except ZeroDivisionError:
-        return "Error: Division by Zero"
-    except Exception as e:
-        print(f"Error evaluating expression: {e}")
-        return "Error: Invalid expression"
-
-# Voice Command Parsing ---
-def parse_voice_command(command):
-    number_words = {
-        "zero": 0, "one": 1, "two": 2, "three": 3, "four": 4,
-        "five": 5, "six": 6, "seven": 7, "eight": 8, "nine": 9,
-    }
-
-    words = command.lower().split()
-    for i, word in enumerate(words):
-        if word in number_words:
-            words[i] = str(number_words[word])
-    command = " ".join(words)
+        if cap is not None:
+            cap.release()
+        capture_channel.close()
+        print("Webcam released and capture thread exited.")
 
+# Gesture Detection 
+def run_gesture_detection(detector):  # detector: created and warmed up by the startup stage
+    from gesture_module import prepare_frame
+    stats_exported_at = time.perf_counter()
+    trace = None
+    if landmark_trace_path:
+        from landmark_trace import LandmarkTraceWriter
+        trace = LandmarkTraceWriter(landmark_trace_path, display_resolution)
     try:
-        numbers = [int(s) for s in command.split() if s.isdigit()]
-        if "add" in command:
-            return f"{' + '.join(map(str, numbers))}"
-        elif "subtract" in command:
-            return f"{' - '.join(map(str, numbers))}"
-        elif "multiply" in command:
-            return f"{' * '.join(map(str, numbers))}"
-        elif "divide" in command:
-            return f"{' / '.join(map(str, numbers))}"
-        else:
-            return f"Error: Unrecognized operation in command: '{command}'"
-    except Exception as e:
-        print(f"Error parsing voice command: {e}")
-    return "Error: Command not recognized"
+        while not stop_threads:
+            item = capture_channel.get(timeout=0.1)  # Frames that arrived while busy were already dropped
+            if item is None:
+                if capture_channel.closed:
+                    break  # Capture stage has exited
+                continue
+            if not gesture_detection_active:
+                continue
+            frame, captured_at = item
+            if detector_reset_requested.is_set():
+                detector_reset_requested.clear()
+                detector.reset()  # Thumbnail, ROI and landmarks from before the pause are stale
+            if session_reset_requested.is_set():
+                session_reset_requested.clear()
+                gesture_session.reset()  # Here rather than on the GUI thread, which would race process_frame
+
+            frame = prepare_frame(frame, display_resolution)
+            with metrics.time("detect"):
+                landmarks = detector.detect(frame)  # Detecting hands
+            now = time.time()
+            fingertip, phase = gesture_session.process_frame(frame, landmarks, now)
+            if trace is not None:
+                trace.write(now, landmarks)  # Same timestamp the selection logic saw, for exact replay
+
+            render_channel.put((frame, fingertip, phase, captured_at))  # Overlay drawing happens on the render stage
+            if time.perf_counter() - stats_exported_at >= detector_stats_interval:
+                export_detector_stats(detector)
+                stats_exported_at = time.perf_counter()
+    finally:
+        stats = export_detector_stats(detector)
+        if motion_gated_inference:
+            print(f"Hand inference ran on {stats['inferences']} of {stats['frames']} frames "
+                  f"({stats['skipped']} skipped, {stats['inferences_per_second']:.1f} inferences/s).")
+        detector.close()  # Stops the worker process, so gesture_thread.join() covers it
+        if trace is not None:
+            trace.close()
+            print(f"Recorded {trace.frames} frames of hand landmarks to {landmark_trace_path}.")
+        render_channel.close()
+        print("Gesture detection thread exited.")
+
+# Hand inference counters (motion gating) as gauges next to the stage latencies
+def export_detector_stats(detector):
+    from gesture_module import detector_stats
+    stats = detector_stats(detector)
+    for name, value in stats.items():
+        metrics.set_gauge(f"hand_{name}", value)
+    return stats
+
+# Render Stage
+def run_render():
+    from gesture_module import render_frame
+    while not stop_threads:
+        item = render_channel.get(timeout=0.1)
+        if item is None:
+            if render_channel.closed:
+                break  # Gesture detection stage has exited
+            continue
+        frame, fingertip, phase, captured_at = item
+        with metrics.time("overlay"):
+            render_frame(frame, fingertip, phase)
+            if show_latency_hud:
+                draw_latency_hud(frame)
+        frame_channel.put((frame, captured_at, time.perf_counter()))  # Replace any frame the GUI has not shown yet
+
+# Latency HUD, using the stage timings of the frames shown so far
+def draw_latency_hud(frame):
+    import cv2
+    frame_interval = metrics.percentile("frame_interval", 0.5)
+    fps = 1000 / frame_interval if frame_interval else 0.0
+    lines = [
+        f"FPS {fps:.1f}",
+        f"detect p50 {metrics.percentile('detect', 0.5):.1f} ms  p95 {metrics.percentile('detect', 0.95):.1f} ms",
+        f"capture->display p50 {metrics.percentile('capture_to_display', 0.5):.1f} ms"
+        f"  p95 {metrics.percentile('capture_to_display', 0.95):.1f} ms",
+    ]
+    for i, text in enumerate(lines):
+        cv2.putText(frame, text, (10, 20 + i * 20), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
 
 # Application Entry Point 
 if __name__ == "__main__":
-    gesture_thread = threading.Thread(target=run_gesture_detection, daemon=True)  # Start the gesture detection thread
-    gesture_thread.start()
+    mark_startup("imports")
+    if gestures_on_start:
+        gesture_detection_active = True
+        gesture_enabled.set()
 
     app = QApplication([])
     calculator = CalculatorGUI()
     current_expression = ""
     voice_result = ""
 
+    last_dropped_frames = 0
+    last_frame_shown_at = None
+
+    def report_backpressure(): #Prints channel stats whenever the GUI has fallen behind the detection thread
+        global last_dropped_frames
+        stats = frame_channel.stats()
+        metrics.set_gauge("frames_dropped_total", stats["frames_dropped"])
+        metrics.set_gauge("event_queue_depth", event_queue.qsize())
+        if stats["frames_dropped"] > last_dropped_frames:
+            print(f"Frame channel: {stats['frames_dropped']} of {stats['frames_put']} frames dropped, "
+                  f"frame depth {stats['depth']}, event depth {event_queue.qsize()}")
+            last_dropped_frames = stats["frames_dropped"]
+
     def process_queue():
         global current_expression
-        while not command_queue.empty():
-            command, cmd_type = command_queue.get()
-            if cmd_type == "gesture" and gesture_detection_active:
-                calculator.update_expression(command)
-            elif cmd_type == "frame" and gesture_detection_active:
-                frame = command
-                frame_resized = cv2.resize(frame, (800, 500))  # Resizing the frame for GUI
-                frame_rgb = cv2.cvtColor(frame_resized, cv2.COLOR_BGR2RGB)
-                height, width, channel = frame_rgb.shape
-                bytes_per_line = 3 * width
-                q_image = QImage(frame_rgb.data, width, height, bytes_per_line, QImage.Format_RGB888)
-                calculator.update_webcam_feed(QPixmap.fromImage(q_image))
+        with metrics.time("event_dispatch"):
+            while True:
+                try:
+                    command, cmd_type = event_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if cmd_type == "gesture" and gesture_detection_active:
+                    calculator.update_expression(command)
+
+        report_backpressure()
+
+    def show_latest_frame(): #Runs on the GUI thread as soon as the detection thread publishes a frame
+        global last_frame_shown_at
+        item = frame_channel.get_nowait()
+        if item is not None and gesture_detection_active:
+            frame, captured_at, published_at = item
+            now = time.perf_counter()
+            if last_frame_shown_at is None:
+                mark_startup("first_annotated_frame")
+            metrics.observe("queue_wait", (now - published_at) * 1000)
+            calculator.update_webcam_feed(frame)  # Frame is already 775x500 BGR, painted without conversion
+            metrics.observe("capture_to_display", (now - captured_at) * 1000)
+            if last_frame_shown_at is not None:
+                metrics.observe("frame_interval", (now - last_frame_shown_at) * 1000)
+            last_frame_shown_at = now
+
+    # Frames are pushed through a queued signal; events are still drained periodically
+    calculator.frame_ready.connect(show_latest_frame, Qt.QueuedConnection)
+    frame_channel.on_ready = calculator.frame_ready.emit
 
     timer = QTimer()
     timer.timeout.connect(process_queue)  # Calling process_queue periodically
     timer.start(100)  # Interval of 100ms
 
-    def activate_voice_logic(): #Calls the recognize_voice function from the voice module
+    if metrics_json_path or metrics_prometheus_path:
+        metrics.start_exporter(metrics_json_path, metrics_prometheus_path, metrics_export_interval)
+
+    def activate_voice_logic(): #Asks the voice worker to listen without blocking the GUI
+        if voice_worker is None and voice_startup_error is not None:
+            calculator.update_expression(f"Error: Voice input unavailable ({voice_startup_error})")
+        elif voice_worker is None:
+            calculator.update_expression("Voice input is starting...")
+        elif voice_worker.request():
+            calculator.update_expression("Listening...")
+        elif voice_worker.error is not None:  # The worker thread died, e.g. the microphone went away
+            calculator.update_expression(f"Error: Voice input stopped ({voice_worker.error})")
+
+    def handle_voice_partial(text): #Parses partial hypotheses from streaming backends while the user speaks
+        expression = parse_voice_command(text)
+        calculator.update_expression(f"{text}..." if "Error" in expression else f"{expression} ...")
+
+    def handle_voice_command(transcripts): #Runs on the GUI thread with the recognizer's n-best transcripts
         global voice_result
-        voice_recognizer = VoiceRecognizer()
-        command = voice_recognizer.recognize_voice()
-        if command:
-            expression = parse_voice_command(command)
-            if "Error" not in expression:
-                voice_result = evaluate_expression(expression)
-                calculator.update_expression(voice_result)
-            else:
-                voice_result = expression
-                calculator.update_expression(voice_result)
+        if not transcripts:
+            calculator.update_expression("Error: Could not understand the audio")
+            return
+        expression = parse_voice_alternatives(transcripts)  # First transcript that parses
+        if "Error" not in expression:
+            voice_result = evaluate_expression(expression)
+            calculator.update_expression(voice_result)
+        else:
+            voice_result = expression
+            calculator.update_expression(voice_result)
 
     def toggle_gesture_detection():
         global gesture_detection_active
+        if gesture_startup_error is not None:  # No pipeline stages are running to act on the toggle
+            calculator.update_expression(f"Error: Gesture input unavailable ({gesture_startup_error})")
+            return
         gesture_detection_active = not gesture_detection_active
+        if gesture_detection_active:
+            detector_reset_requested.set()
+            gesture_enabled.set()
+        else:
+            gesture_enabled.clear()
         state = "enabled" if gesture_detection_active else "disabled"
         print(f"Gesture detection {state}.")
 
     def clear_expression(): #Clears the expression generated till now
-        global selected_expression, current_phase
-        selected_expression = []  # Reset the expression buffer
-        current_phase = "select_number"  # Reset to the initial phase
+        session_reset_requested.set()  # Applied by the gesture thread before its next frame
         calculator.update_expression("")  # Clear the display
         print("Expression cleared.")
 
     # Connecting the GUI buttons to their respective logic
     calculator.voice_button.clicked.connect(activate_voice_logic)
+    calculator.voice_command_ready.connect(handle_voice_command, Qt.QueuedConnection)
+    calculator.voice_partial_ready.connect(handle_voice_partial, Qt.QueuedConnection)
     calculator.gesture_button.clicked.connect(toggle_gesture_detection)
     calculator.clear_button.clicked.connect(clear_expression)
 
+    # Voice, camera and hand model start in the background once the window is up
+    startup_thread = threading.Thread(target=run_startup, args=(calculator,), daemon=True)
+
+    def start_background_startup():
+        mark_startup("window_shown")
+        startup_thread.start()
+
     calculator.show()
+    QTimer.singleShot(0, start_background_startup)  # Runs once the event loop has shown the window
     app.exec()
 
     # Ensuring threads stop when the application exits
     stop_threads = True
-    gesture_thread.join()
+    if startup_thread.is_alive():
+        startup_thread.join()  # Lets a model warm-up in progress finish and clean up
+    if voice_worker is not None:
+        voice_worker.stop()
+    gesture_enabled.set()  # Wake the capture stage if it is parked
+    capture_channel.close()
+    render_channel.close()
+    frame_channel.close()
+    for thread in stage_threads:
+        thread.join()
+    metrics.stop_exporter()
     print("Gesture recognition thread terminated.")
@@ -0,0 +1,80 @@
+import cv2
+
+
+class RoiHandTracker:
+    # Sits in front of a hand detector and decides which pixels it sees.
+    # inference_size sets the resolution hand inference runs at, independent of the display frame.
+    # With roi_tracking enabled, once a hand has been found only a padded region around the
+    # last hand (which contains the index fingertip) is sent for inference; landmarks are mapped
+    # back to normalized display coordinates, and a miss falls back to full-frame detection.
+    # The crop moves and resizes with the hand, so the wrapped detector must treat every input as
+    # a new image (static_image_mode): MediaPipe's own tracking assumes one fixed image geometry.
+    def __init__(self, detector, inference_size=None, roi_tracking=False, roi_padding=0.6, min_roi_size=160):
+        self.detector = detector
+        self.inference_size = inference_size  # (width, height) for full frames, None keeps the display size
+        self.roi_tracking = roi_tracking
+        self.roi_padding = roi_padding  # Extra margin around the last hand, as a fraction of its size
+        self.min_roi_size = min_roi_size  # Smallest ROI side in display pixels
+        self.roi_hits = 0
+        self.roi_misses = 0
+        self._landmarks = None
+
+    def detect(self, frame):
+        height, width = frame.shape[:2]
+        if self.roi_tracking and self._landmarks is not None:
+            x0, y0, x1, y1 = self._roi(width, height)
+            landmarks = self._detect_scaled(frame[y0:y1, x0:x1], width, height)
+            if landmarks is not None:
+                self.roi_hits += 1
+                landmarks = landmarks.copy()
+                landmarks[:, 0] = (landmarks[:, 0] * (x1 - x0) + x0) / width
+                landmarks[:, 1] = (landmarks[:, 1] * (y1 - y0) + y0) / height
+                landmarks[:, 2] *= (x1 - x0) / width  # z shares the x scale in MediaPipe
+                self._landmarks = landmarks
+                return landmarks
+            self.roi_misses += 1  # Hand lost inside the ROI, search the whole frame
+
+        landmarks = self._detect_scaled(frame, width, height)
+        self._landmarks = landmarks
+        return landmarks
+
+    def _roi(self, width, height):
+        # Square region around the last hand's bounding box, padded and clipped to the frame
+        xs = self._landmarks[:, 0] * width
+        ys = self._landmarks[:, 1] * height
+        center_x, center_y = (xs.min() + xs.max()) / 2, (ys.min() + ys.max()) / 2
+        side = max(xs.max() - xs.min(), ys.max() - ys.min()) * (1 + 2 * self.roi_padding)
+        side = min(max(side, self.min_roi_size), width, height)
+        x0 = int(min(max(center_x - side / 2, 0), width - side))
+        y0 = int(min(max(center_y - side / 2, 0), height - side))
+        return x0, y0, x0 + int(side), y0 + int(side)
+
+    def _detect_scaled(self, image, display_width, display_height):
+        # Crops are scaled by the same factors as full frames, so inference cost follows the ROI area
+        if self.inference_size is not None:
+            scale_x = self.inference_size[0] / display_width
+            scale_y = self.inference_size[1] / display_height
+            size = (max(round(image.shape[1] * scale_x), 1), max(round(image.shape[0] * scale_y), 1))
+            if size != (image.shape[1], image.shape[0]):
+                image = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+        return self.detector.detect(image)
+
+    def warm_up(self, frame_shape):
+        if self.inference_size is not None:
+            frame_shape = (self.inference_size[1], self.inference_size[0]) + tuple(frame_shape[2:])
+        self.detector.warm_up(frame_shape)
+
+    def stats(self):
+        attempts = self.roi_hits + self.roi_misses
+        return {
+            "roi_hits": self.roi_hits,
+            "roi_misses": self.roi_misses,
+            "roi_hit_ratio": self.roi_hits / attempts if attempts else 0.0,
+        }
+
+    def reset(self):  # The next frame is searched in full
+        self._landmarks = None
+        self.detector.reset()
+
+    def close(self):
+        self.detector.close()
@@ -0,0 +1,106 @@
+import math
+
+# Fingertip smoothing and dwell-based bubble selection.
+# A bubble is selected once the smoothed fingertip has rested on it for dwell_time, instead of
+# the first time it passes over one after a fixed 2 s lockout. Hysteresis (a smaller radius to
+# enter a bubble than to leave it) keeps jitter at the edge from restarting the dwell, and a
+# selection re-arms only after the fingertip has been off the selected bubble for rearm_time.
+
+
+class OneEuroFilter:
+    # One Euro filter (Casiez et al., CHI 2012) over a point: heavy smoothing while the hand is
+    # nearly still, little lag while it moves fast. Cutoffs in Hz, values in pixels, time in seconds.
+    def __init__(self, min_cutoff=1.0, beta=0.01, d_cutoff=1.0):
+        self.min_cutoff = min_cutoff  # Lower it to remove more jitter at rest
+        self.beta = beta  # Raise it to reduce lag during fast moves
+        self.d_cutoff = d_cutoff  # Cutoff for the speed estimate
+        self.reset()
+
+    def reset(self):  # Call when tracking is lost, so the next point is not pulled towards a stale one
+        self._point = None
+        self._velocity = None
+        self._time = None
+
+    def __call__(self, point, now):
+        if self._point is None:
+            self._point = [float(value) for value in point]
+            self._velocity = [0.0] * len(self._point)
+            self._time = now
+            return tuple(self._point)
+        elapsed = now - self._time
+        if elapsed <= 0:  # Same or out-of-order timestamp: keep the last estimate
+            return tuple(self._point)
+        self._time = now
+
+        alpha = _smoothing_factor(self.d_cutoff, elapsed)
+        self._velocity = [previous + alpha * ((value - last) / elapsed - previous)
+                          for value, last, previous in zip(point, self._point, self._velocity)]
+        cutoff = self.min_cutoff + self.beta * math.hypot(*self._velocity)
+        alpha = _smoothing_factor(cutoff, elapsed)
+        self._point = [last + alpha * (value - last) for value, last in zip(point, self._point)]
+        return tuple(self._point)
+
+
+def _smoothing_factor(cutoff, elapsed):
+    tau = 1.0 / (2 * math.pi * cutoff)
+    return 1.0 / (1.0 + tau / elapsed)
+
+
+_UNDER_FINGER = object()  # Held after a layout change: whatever bubble the next fingertip is on
+
+
+class DwellSelector:
+    # Per-bubble dwell state machine: idle -> dwelling on a bubble -> selected -> re-armed.
+    # update() takes the BubbleLayout of the current phase and returns the label selected on this
+    # frame, or None. Both hit tests are label map lookups, at enter_ratio and exit_ratio scale.
+    # After reset(hold=True) the bubble under the next fingertip counts as just selected, so a bubble
+    # of a new layout that happens to sit under the finger is only selected after leaving and returning.
+    def __init__(self, dwell_time=0.5, rearm_time=0.15, enter_ratio=0.8, exit_ratio=1.2):
+        self.dwell_time = dwell_time  # Seconds on a bubble before it is selected
+        self.rearm_time = rearm_time  # Seconds off the selected bubble before it can be selected again
+        self.enter_ratio = enter_ratio  # Fraction of the radius to enter a bubble
+        self.exit_ratio = exit_ratio  # Fraction of the radius to leave it again
+        self.reset()
+
+    def reset(self, hold=False):  # hold: call when the layout changes under the fingertip
+        self.target = None  # Bubble the fingertip is on
+        self.dwell_start = None
+        self._selected = _UNDER_FINGER if hold else None  # Last selected label, not re-armed yet
+        self._left_at = None  # When the fingertip left the selected bubble
+
+    def progress(self, now):  # (label, 0..1) of the current dwell, for drawing feedback
+        if self.target is None or self.target == self._selected or self._selected is _UNDER_FINGER:
+            return None, 0.0
+        return self.target, min((now - self.dwell_start) / self.dwell_time, 1.0)
+
+    def update(self, fingertip, layout, now):
+        if self._selected is _UNDER_FINGER:  # Exit-scale test, so leaving the held bubble needs hysteresis too
+            self._selected = None if fingertip is None else layout.label_at(fingertip, self.exit_ratio)
+            self.target, self.dwell_start = self._selected, now
+        target = self._target(fingertip, layout)
+        if target != self.target:
+            self.target = target
+            self.dwell_start = now
+
+        if self._selected is not None:
+            if target == self._selected:
+                self._left_at = None
+                return None
+            if self._left_at is None:
+                self._left_at = now
+            if now - self._left_at < self.rearm_time:
+                return None
+            self._selected = None
+
+        if target is not None and now - self.dwell_start >= self.dwell_time:
+            self._selected = target
+            self._left_at = None
+            return target
+        return None
+
+    def _target(self, fingertip, layout):
+        if fingertip is None:
+            return None
+        if self.target is not None and layout.label_at(fingertip, self.exit_ratio) == self.target:
+            return self.target  # Stay on the current bubble until the fingertip clearly leaves it
+        return layout.label_at(fingertip, self.enter_ratio)
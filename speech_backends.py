@@ -0,0 +1,138 @@
+import json
+import wave
+import speech_recognition as sr
+from voice_grammar import VOCABULARY
+
+# Speech backends behind one interface, so the voice path can run online (Google Web Speech)
+# or fully offline (Vosk, restricted to the calculator vocabulary).
+#   recognize(audio)                 -> text or None, for a captured sr.AudioData
+#   alternatives(audio)              -> n-best transcripts, most likely first (empty if nothing was heard)
+#   stream(chunks, sample_rate)      -> yields ("partial", text) while audio arrives, then ("final", text);
+#                                       with stop_at_endpoint the final comes at the end of the first utterance
+
+# Words the voice grammar understands, plus the fillers people put between them
+CALCULATOR_VOCABULARY = VOCABULARY
+SAMPLE_WIDTH = 2  # 16-bit PCM, what sr.Microphone records and Vosk expects
+
+
+class SpeechBackend:
+    name = "base"
+    streaming = False  # True if stream() yields partial hypotheses before the utterance ends
+
+    def recognize(self, audio):
+        raise NotImplementedError
+
+    def alternatives(self, audio):  # Backends without an n-best list return their single best guess
+        text = self.recognize(audio)
+        return [text] if text else []
+
+    def stream(self, chunks, sample_rate, stop_at_endpoint=False):
+        raise NotImplementedError
+
+
+class GoogleBackend(SpeechBackend):
+    # Online recognition through the Google Web Speech API; one network round-trip per command
+    name = "google"
+
+    def __init__(self, recognizer=None):
+        self.recognizer = recognizer or sr.Recognizer()
+
+    def recognize(self, audio):  # Raises sr.UnknownValueError / sr.RequestError like recognize_google
+        return self.recognizer.recognize_google(audio, show_all=False)
+
+    def alternatives(self, audio):  # One request returns the whole n-best list with show_all=True
+        response = self.recognizer.recognize_google(audio, show_all=True)
+        if not response:  # Nothing recognized comes back as an empty list
+            return []
+        return [alternative["transcript"] for alternative in response.get("alternative", [])
+                if alternative.get("transcript")]
+
+    def stream(self, chunks, sample_rate, stop_at_endpoint=False):  # No partials: buffers all audio, then recognizes it
+        audio = sr.AudioData(b"".join(chunks), sample_rate, SAMPLE_WIDTH)
+        try:
+            yield "final", self.recognize(audio)
+        except sr.UnknownValueError:
+            yield "final", ""
+
+
+class VoskBackend(SpeechBackend):
+    # Offline recognition with a local Vosk model, decoding only the calculator vocabulary.
+    # Needs `pip install vosk` and a model directory, e.g. vosk-model-small-en-us-0.15.
+    name = "vosk"
+    streaming = True
+
+    def __init__(self, model_path, vocabulary=CALCULATOR_VOCABULARY):
+        try:
+            import vosk
+        except ImportError as e:
+            raise RuntimeError("The offline speech backend needs the 'vosk' package: pip install vosk") from e
+        vosk.SetLogLevel(-1)
+        self._vosk = vosk
+        self._model = vosk.Model(model_path)
+        self._grammar = json.dumps(list(vocabulary) + ["[unk]"])  # Anything else decodes as [unk]
+
+    def stream(self, chunks, sample_rate, stop_at_endpoint=False):
+        recognizer = self._vosk.KaldiRecognizer(self._model, sample_rate, self._grammar)
+        finished = []  # Utterance segments Vosk has already closed
+        for chunk in chunks:
+            if recognizer.AcceptWaveform(chunk):
+                segment = _clean(json.loads(recognizer.Result())["text"])
+                if segment:
+                    finished.append(segment)
+                    if stop_at_endpoint:  # Vosk detected the end of the utterance
+                        yield "final", " ".join(finished)
+                        return
+                    yield "partial", " ".join(finished)
+            else:
+                partial = _clean(json.loads(recognizer.PartialResult())["partial"])
+                if partial:
+                    yield "partial", " ".join(finished + [partial])
+        segment = _clean(json.loads(recognizer.FinalResult())["text"])
+        if segment:
+            finished.append(segment)
+        yield "final", " ".join(finished)
+
+    def recognize(self, audio):
+        sample_rate = audio.sample_rate
+        raw = audio.get_raw_data(convert_width=SAMPLE_WIDTH)
+        chunk_size = sample_rate // 4 * SAMPLE_WIDTH  # 250 ms per chunk
+        chunks = (raw[i:i + chunk_size] for i in range(0, len(raw), chunk_size))
+        command = None
+        for kind, text in self.stream(chunks, sample_rate):
+            if kind == "final":
+                command = text or None
+        return command
+
+
+def _clean(text):
+    return " ".join(word for word in text.split() if word != "[unk]")
+
+
+def create_speech_backend(name="google", model_path=None, recognizer=None):
+    if name == "google":
+        return GoogleBackend(recognizer)
+    if name == "vosk":
+        if not model_path:
+            raise ValueError("The vosk backend needs a model_path")
+        return VoskBackend(model_path)
+    raise ValueError(f"Unknown speech backend: {name}")
+
+
+def wav_chunks(path, chunk_seconds=0.25):
+    # (sample_rate, chunk generator) for a mono 16-bit PCM WAV file
+    wav = wave.open(path, "rb")
+    if wav.getnchannels() != 1 or wav.getsampwidth() != SAMPLE_WIDTH:
+        wav.close()
+        raise ValueError(f"{path}: expected mono 16-bit PCM audio")
+    sample_rate = wav.getframerate()
+
+    def chunks():
+        with wav:
+            frames_per_chunk = max(int(sample_rate * chunk_seconds), 1)
+            while True:
+                data = wav.readframes(frames_per_chunk)
+                if not data:
+                    break
+                yield data
+
+    return sample_rate, chunks()
@@ -0,0 +1,134 @@
+import json
+import os
+import threading
+import time
+from array import array
+from contextlib import contextmanager
+
+
+class LatencyHistogram:
+    # Fixed-size ring buffer of the most recent samples (milliseconds); percentiles over that window
+    def __init__(self, size=512):
+        self._samples = array("d", [0.0]) * size
+        self._index = 0
+        self.count = 0  # Samples ever observed
+        self.total = 0.0  # Sum of samples ever observed
+
+    def observe(self, value):
+        self._samples[self._index] = value
+        self._index = (self._index + 1) % len(self._samples)
+        self.count += 1
+        self.total += value
+
+    def percentiles(self, *quantiles):  # Nearest-rank percentiles of the current window
+        window = sorted(self._samples[:min(self.count, len(self._samples))])
+        if not window:
+            return [0.0 for _ in quantiles]
+        return [window[min(int(q * len(window)), len(window) - 1)] for q in quantiles]
+
+
+class StageMetrics:
+    # Thread-safe registry of per-stage latency histograms and gauges
+    QUANTILES = (0.5, 0.95, 0.99)
+
+    def __init__(self, window=512):
+        self.window = window
+        self._histograms = {}
+        self._gauges = {}
+        self._lock = threading.Lock()
+        self._exporter = None
+        self._exporter_stop = threading.Event()
+
+    def observe(self, stage, milliseconds):
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = LatencyHistogram(self.window)
+            histogram.observe(milliseconds)
+
+    @contextmanager
+    def time(self, stage):  # with metrics.time("hands_process"): ...
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, (time.perf_counter() - start) * 1000)
+
+    def set_gauge(self, name, value):
+        with self._lock:
+            self._gauges[name] = value
+
+    def percentile(self, stage, quantile):
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            return histogram.percentiles(quantile)[0] if histogram else 0.0
+
+    def snapshot(self):
+        with self._lock:
+            stages = {}
+            for stage, histogram in self._histograms.items():
+                p50, p95, p99 = histogram.percentiles(*self.QUANTILES)
+                stages[stage] = {
+                    "count": histogram.count,
+                    "mean_ms": histogram.total / histogram.count,
+                    "p50_ms": p50,
+                    "p95_ms": p95,
+                    "p99_ms": p99,
+                }
+            return {"timestamp": time.time(), "stages": stages, "gauges": dict(self._gauges)}
+
+    def export_json(self, path):
+        _write_atomic(path, json.dumps(self.snapshot(), indent=2))
+
+    def export_prometheus(self, path):
+        snapshot = self.snapshot()
+        lines = [
+            "# HELP gvc_stage_latency_ms Per-stage latency in milliseconds over the recent window",
+            "# TYPE gvc_stage_latency_ms summary",
+        ]
+        for stage, stats in sorted(snapshot["stages"].items()):
+            for quantile in self.QUANTILES:
+                value = stats[f"p{int(quantile * 100)}_ms"]
+                lines.append(f'gvc_stage_latency_ms{{stage="{stage}",quantile="{quantile}"}} {value:.4f}')
+            lines.append(f'gvc_stage_latency_ms_count{{stage="{stage}"}} {stats["count"]}')
+            lines.append(f'gvc_stage_latency_ms_sum{{stage="{stage}"}} {stats["mean_ms"] * stats["count"]:.4f}')
+        for name, value in sorted(snapshot["gauges"].items()):
+            lines.append(f"# TYPE gvc_{name} gauge")
+            lines.append(f"gvc_{name} {value}")
+        _write_atomic(path, "\n".join(lines) + "\n")
+
+    def start_exporter(self, json_path=None, prometheus_path=None, interval=10.0):
+        # Periodically writes the snapshot to a JSON file and/or a Prometheus text file
+        def run():
+            while not self._exporter_stop.wait(interval):
+                self._export(json_path, prometheus_path)
+            self._export(json_path, prometheus_path)  # Final snapshot on shutdown
+
+        self._exporter_stop.clear()
+        self._exporter = threading.Thread(target=run, daemon=True)
+        self._exporter.start()
+
+    def stop_exporter(self):
+        if self._exporter is not None:
+            self._exporter_stop.set()
+            self._exporter.join()
+            self._exporter = None
+
+    def _export(self, json_path, prometheus_path):
+        try:
+            if json_path:
+                self.export_json(json_path)
+            if prometheus_path:
+                self.export_prometheus(prometheus_path)
+        except OSError as e:
+            print(f"Error exporting metrics: {e}")
+
+
+def _write_atomic(path, text):  # Readers never see a half-written file
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w") as f:
+        f.write(text)
+    os.replace(temp_path, path)
+
+
+metrics = StageMetrics()  # Shared registry for the gesture, GUI and voice paths
@@ -0,0 +1,185 @@
+import re
+
+# Voice command grammar, compiled once at import and parsed in a single pass over the words.
+# Understands compound numbers ("twenty three", "one hundred and five", "two thousand",
+# "three point one four", "negative five"), infix operators with their usual precedence
+# ("twenty three plus four times two", "six over two", "ten divided by four") and the verb
+# forms of the original parser ("add two and three", "subtract three from five").
+# The result is an expression string for expression_engine, or an "Error: ..." message.
+
+UNITS = {
+    "zero": 0, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7,
+    "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12, "thirteen": 13, "fourteen": 14,
+    "fifteen": 15, "sixteen": 16, "seventeen": 17, "eighteen": 18, "nineteen": 19,
+}
+TENS = {
+    "twenty": 20, "thirty": 30, "forty": 40, "fifty": 50, "sixty": 60, "seventy": 70, "eighty": 80, "ninety": 90,
+}
+SCALES = {"hundred": 100, "thousand": 1000, "million": 1000000}
+INFIX_OPERATORS = {
+    "plus": "+", "minus": "-", "times": "*", "multiplied": "*", "x": "*", "over": "/", "divided": "/",
+    "+": "+", "-": "-", "*": "*", "/": "/", "×": "*", "÷": "/",
+}
+VERBS = {"add": "+", "sum": "+", "subtract": "-", "multiply": "*", "divide": "/"}
+SEPARATORS = {"and", "by", "from", "to", "with"}  # Between operands; "and" may also continue a number
+FILLERS = {"what", "whats", "is", "calculate", "compute", "please", "the", "of", "equals", "equal"}
+
+# One table lookup per word: (kind, value)
+_WORDS = {}
+_WORDS.update((word, ("unit", value)) for word, value in UNITS.items())
+_WORDS.update((word, ("tens", value)) for word, value in TENS.items())
+_WORDS.update((word, ("scale", value)) for word, value in SCALES.items())
+_WORDS.update((word, ("op", symbol)) for word, symbol in INFIX_OPERATORS.items())
+_WORDS.update((word, ("verb", symbol)) for word, symbol in VERBS.items())
+_WORDS.update((word, ("sep", word)) for word in SEPARATORS)
+_WORDS.update((word, ("filler", word)) for word in FILLERS)
+_WORDS["point"] = ("point", ".")
+_WORDS["negative"] = ("sign", "-")
+_TOKEN_PATTERN = re.compile(r"\d+(?:\.\d+)?|[a-z]+|[-+*/×÷]")
+_WORD_HYPHEN = re.compile(r"(?<=[a-z])-(?=[a-z])")  # "twenty-three"
+_THOUSANDS_SEPARATOR = re.compile(r"(?<=\d),(?=\d{3}(?!\d))")  # "1,000", as Google writes "one thousand"
+
+# Words a constrained recognizer needs to produce every command above
+VOCABULARY = sorted(word for word in _WORDS if word.isalpha())
+
+
+class _Number:
+    # Compound number being spoken: total of finished scales plus the current group below 1000
+    def __init__(self, sign=""):
+        self.sign = sign
+        self.total = 0
+        self.group = 0
+        self.last = None  # Kind of the last word: "unit", "tens", "scale", "point", "digit"
+        self.decimals = None  # Decimal digits after "point"
+        self.literal = None  # Number the recognizer already wrote in digits
+
+    def accepts(self, kind, value, next_kind):
+        # True if the word continues this number rather than starting a new one
+        if self.literal is not None or kind == "digit":
+            return False
+        if self.decimals is not None:
+            return kind == "unit" and value < 10
+        if kind == "unit":
+            return self.last == "scale" or (self.last == "tens" and value < 10)
+        if kind == "tens":
+            return self.last == "scale"
+        if kind == "scale":
+            return self.last in ("unit", "tens") or (self.last == "scale" and value > self.group)
+        if kind == "point":
+            return self.last in ("unit", "tens", "scale")
+        if kind == "and":  # "one hundred and five"
+            return self.last == "scale" and next_kind in ("unit", "tens")
+        return False
+
+    def add(self, kind, value):
+        if kind == "digit":
+            self.literal = value
+        elif self.decimals is not None:
+            self.decimals += str(value)
+        elif kind in ("unit", "tens"):
+            self.group += value
+        elif kind == "scale":
+            if value == 100:
+                self.group = (self.group or 1) * 100
+            else:
+                self.total += (self.group or 1) * value
+                self.group = 0
+        elif kind == "point":
+            self.decimals = ""
+        if kind != "and":
+            self.last = kind
+
+    def text(self):
+        if self.literal is not None:
+            return self.sign + self.literal
+        digits = str(self.total + self.group)
+        if self.decimals:
+            digits += "." + self.decimals
+        return self.sign + digits
+
+
+def _tokens(command):
+    command = _THOUSANDS_SEPARATOR.sub("", _WORD_HYPHEN.sub(" ", command.lower()))
+    return _TOKEN_PATTERN.findall(command)
+
+
+def _classify(token):
+    if token[0].isdigit():
+        return "digit", token
+    kind, value = _WORDS.get(token, ("unknown", token))
+    if kind == "sep" and token == "and":
+        return "and", token
+    return kind, value
+
+
+def parse_voice_command(command):
+    # Single pass: words become operands, operators and separators as they are read.
+    # Words outside the grammar are skipped, like the original parser did.
+    classified = [_classify(token) for token in _tokens(command)]
+    items = []  # ("num", text) / ("op", symbol) / ("verb", symbol) / ("sep", word)
+    number = None
+    sign = ""
+    for index, (kind, value) in enumerate(classified):
+        next_kind = classified[index + 1][0] if index + 1 < len(classified) else None
+        if number is not None:
+            if number.accepts(kind, value, next_kind):
+                number.add(kind, value)
+                continue
+            items.append(("num", number.text()))
+            number = None
+
+        expecting_operand = not items or items[-1][0] != "num"
+        if kind in ("unit", "tens", "scale", "point", "digit"):
+            number = _Number(sign)
+            number.add(kind, value)
+            sign = ""
+        elif kind == "sign" or (kind == "op" and value == "-" and expecting_operand):
+            sign = "" if sign else "-"  # "negative five", "minus five" where an operand is expected
+        elif kind in ("op", "verb"):
+            items.append((kind, value))
+        elif kind in ("sep", "and"):
+            items.append(("sep", value))
+    if number is not None:
+        items.append(("num", number.text()))
+    return _build_expression(items, command)
+
+
+def _build_expression(items, command):
+    numbers = [value for kind, value in items if kind == "num"]
+    verbs = [value for kind, value in items if kind == "verb"]
+    operators = [value for kind, value in items if kind == "op"]
+    if not numbers:
+        return "Error: Command not recognized"
+
+    if verbs:
+        # Verb form: every operand joined by the verb's operator
+        if len(verbs) > 1 or operators:
+            return f"Error: Unrecognized operation in command: '{command}'"
+        symbol = verbs[0]
+        separators = [value for kind, value in items if kind == "sep"]
+        if symbol == "-" and len(numbers) == 2 and "from" in separators:
+            numbers.reverse()  # "subtract three from five" is 5 - 3
+        return f" {symbol} ".join(numbers)
+
+    # Infix form: operands and operators must alternate, separators are ignored
+    tokens = [(kind, value) for kind, value in items if kind != "sep"]
+    if not operators:
+        return f"Error: Unrecognized operation in command: '{command}'"
+    for position, (kind, _) in enumerate(tokens):
+        if kind != ("num" if position % 2 == 0 else "op"):
+            return f"Error: Unrecognized operation in command: '{command}'"
+    if tokens[-1][0] != "num":
+        return f"Error: Command ends with an operator: '{command}'"
+    return " ".join(value for _, value in tokens)
+
+
+def parse_voice_alternatives(alternatives):
+    # First valid parse among the recognizer's n-best transcripts, else the error for the best one
+    first_error = "Error: Command not recognized"
+    for position, transcript in enumerate(alternatives):
+        expression = parse_voice_command(transcript)
+        if not expression.startswith("Error"):
+            return expression
+        if position == 0:
+            first_error = expression
+    return first_error
@@ -1,22 +1,42 @@
+import threading
+import time
 import speech_recognition as sr
+from stage_metrics import metrics
+from speech_backends import GoogleBackend, wav_chunks
 
 class VoiceRecognizer:
-    def __init__(self):
+    def __init__(self, backend=None):
         self.recognizer = sr.Recognizer()
+        self.backend = backend or GoogleBackend(self.recognizer)  # Google Web Speech unless told otherwise
 
-    def recognize_voice(self): #Captures and recognizes voice input using Google Speech API
+    def recognize_voice(self): #Captures and recognizes voice input using the speech backend
         try:
             with sr.Microphone() as source:
                 # Calibrate for ambient noise
                 print("Calibrating for ambient noise... Please wait.")
-                self.recognizer.adjust_for_ambient_noise(source, duration=2)
-                
+                with metrics.time("voice_calibration"):
+                    self.recognizer.adjust_for_ambient_noise(source, duration=2)
+
                 print("Listening for command...")
-                audio = self.recognizer.listen(source, timeout=10, phrase_time_limit=8)
+                with metrics.time("voice_listen"):
+                    audio = self.recognizer.listen(source, timeout=10, phrase_time_limit=8)
+
+            return self.recognize_audio(audio)
 
-            # Recognize speech using Google Web Speech API
-            print("Recognizing...")
-            command = self.recognizer.recognize_google(audio, show_all=False)
+        except sr.WaitTimeoutError:
+            print("Error: No speech detected before the listening timeout.")
+            return None
+        except Exception as e:
+            print(f"Unexpected error: {e}")
+            return None
+
+    def recognize_audio(self, audio): #Recognizes captured audio, returns None when nothing was understood
+        try:
+            print(f"Recognizing with {self.backend.name}...")
+            with metrics.time("voice_recognize"):
+                command = self.backend.recognize(audio)
+            if not command:
+                raise sr.UnknownValueError()
             print(f"Recognized command: {command}")
             return command
 
@@ -26,6 +46,125 @@ class VoiceRecognizer:
         except sr.RequestError as e:
             print(f"Error: Could not request results from Google Speech Recognition service; {e}")
             return None
+
+    def recognize_alternatives(self, audio): #N-best transcripts for captured audio, None when nothing was understood
+        try:
+            print(f"Recognizing with {self.backend.name}...")
+            with metrics.time("voice_recognize"):
+                transcripts = self.backend.alternatives(audio)
+            if not transcripts:
+                raise sr.UnknownValueError()
+            print(f"Recognized command: {transcripts[0]} ({len(transcripts)} alternatives)")
+            return transcripts
+
+        except sr.UnknownValueError:
+            print("Error: Could not understand the audio.")
+            return None
+        except sr.RequestError as e:
+            print(f"Error: Could not request results from Google Speech Recognition service; {e}")
+            return None
+
+    def recognize_wav(self, path, on_partial=None): #Recognizes a mono 16-bit WAV file, streaming partials if supported
+        sample_rate, chunks = wav_chunks(path)
+        command = None
+        with metrics.time("voice_recognize"):
+            for kind, text in self.backend.stream(chunks, sample_rate):
+                if kind == "partial" and on_partial is not None:
+                    on_partial(text)
+                elif kind == "final":
+                    command = text or None
+        return command
+
+
+class VoiceWorker(VoiceRecognizer):
+    # Long-lived background listener: keeps the microphone open, calibrates once at startup and
+    # refreshes the calibration while idle, so a request starts listening immediately.
+    # Results (the recognizer's n-best transcripts, most likely first, or None) are passed to on_result
+    # from the worker thread, so the parser can fall back to the next transcript; streaming
+    # backends also pass partial hypotheses to on_partial while the user is still speaking.
+    def __init__(self, on_result, backend=None, on_partial=None, recalibration_interval=60,
+                 calibration_duration=2, refresh_duration=0.5):
+        super().__init__(backend)
+        self.on_result = on_result
+        self.on_partial = on_partial
+        self.recalibration_interval = recalibration_interval  # Seconds between idle calibration refreshes
+        self.calibration_duration = calibration_duration  # Initial calibration, in seconds
+        self.refresh_duration = refresh_duration  # Shorter refreshes keep requests from waiting on them
+        self._requested = threading.Event()
+        self._stopping = threading.Event()
+        self._busy = False
+        self.error = None  # Exception that stopped the worker, e.g. no microphone
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def request(self): # Asks the worker to listen for one command; False if it is already listening
+        if self._busy or not self._thread.is_alive():
+            return False
+        self._requested.set()
+        return True
+
+    def stop(self, timeout=1.0):
+        self._stopping.set()
+        self._requested.set()
+        self._thread.join(timeout)  # A listen in progress may outlive this; the thread is a daemon
+
+    def _run(self):
+        try:
+            with sr.Microphone() as source:
+                self._calibrate(source, self.calibration_duration)
+                while not self._stopping.is_set():
+                    if self._requested.wait(timeout=0.5):
+                        self._requested.clear()
+                        if not self._stopping.is_set():
+                            self._listen(source)
+                    elif time.monotonic() - self._calibrated_at > self.recalibration_interval:
+                        self._calibrate(source, self.refresh_duration)
+        except Exception as e:
+            self.error = e
+            print(f"Voice worker stopped: {e}")
+
+    def _calibrate(self, source, duration):
+        with metrics.time("voice_calibration"):
+            self.recognizer.adjust_for_ambient_noise(source, duration=duration)
+        self._calibrated_at = time.monotonic()
+
+    def _listen(self, source):
+        self._busy = True
+        transcripts = None
+        try:
+            print("Listening for command...")
+            if self.backend.streaming:
+                command = self._stream(source)
+                transcripts = [command] if command else None
+            else:
+                with metrics.time("voice_listen"):
+                    audio = self.recognizer.listen(source, timeout=10, phrase_time_limit=8)
+                transcripts = self.recognize_alternatives(audio)
+        except sr.WaitTimeoutError:
+            print("Error: No speech detected before the listening timeout.")
         except Exception as e:
             print(f"Unexpected error: {e}")
-            return None
+        finally:
+            self._busy = False
+        self.on_result(transcripts)
+
+    def _stream(self, source, time_limit=10):
+        # Feeds microphone chunks to the backend as they are read; stops at the first finished utterance
+        deadline = time.monotonic() + time_limit
+
+        def chunks():
+            while time.monotonic() < deadline and not self._stopping.is_set():
+                yield source.stream.read(source.CHUNK)
+
+        command = ""
+        with metrics.time("voice_listen"):
+            for kind, text in self.backend.stream(chunks(), source.SAMPLE_RATE, stop_at_endpoint=True):
+                if kind == "partial" and self.on_partial is not None:
+                    self.on_partial(text)
+                elif kind == "final":
+                    command = text
+        print(f"Recognized command: {command}")
+        return command or None
+